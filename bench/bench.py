@@ -0,0 +1,152 @@
+"""
+Benchmarks for the kaa interpreter. Run via `bin/bench`.
+
+Each benchmark is timed over several runs, and the results are written as
+JSON. If a baseline results file exists, benchmarks whose median time has
+regressed by more than the threshold are reported, and the exit status is 1.
+"""
+import argparse
+import json
+import os
+import platform
+import statistics
+import subprocess
+import sys
+import time
+
+from kaa.ns import Namespace
+from kaa.reader import Reader
+from kaa.runtime import ENGINES, Runtime
+
+BENCH_DIR = os.path.dirname(os.path.abspath(__file__))
+ROOT_DIR = os.path.dirname(BENCH_DIR)
+CORE_LISP = os.path.join(ROOT_DIR, 'src', 'kaa', 'core.lisp')
+
+
+def bench_lisp(path, engine):
+    "Evaluates a workload file in a fresh runtime."
+    runtime = Runtime(engine)
+    with open(path) as f:
+        source = f.read()
+
+    def run():
+        runtime.eval_string(source)
+    return run
+
+
+def bench_reader(copies=100):
+    "Reads a large file made of repeated copies of `core.lisp`."
+    with open(CORE_LISP) as f:
+        source = f.read() * copies
+    reader = Reader(Namespace('bench'))
+
+    def run():
+        for _ in reader.read_string(source):
+            pass
+    return run
+
+
+def bench_startup():
+    "Starts the interpreter in a new process, which loads `kaa.core`."
+    env = dict(os.environ, PYTHONPATH=os.path.join(ROOT_DIR, 'src'))
+    command = (sys.executable, '-m', 'kaa.main', '--expression=None')
+
+    def run():
+        subprocess.run(command, env=env, check=True)
+    return run
+
+
+def benchmarks():
+    "Returns a dict of benchmark name -> function that sets up a run."
+    benches = {
+        'reader': bench_reader,
+        'startup': bench_startup,
+    }
+    for filename in sorted(os.listdir(BENCH_DIR)):
+        name, ext = os.path.splitext(filename)
+        if ext == '.lisp':
+            for engine_name, engine in ENGINES.items():
+                path = os.path.join(BENCH_DIR, filename)
+                benches[f'{name}[{engine_name}]'] = \
+                    lambda path=path, engine=engine: bench_lisp(path, engine)
+    return benches
+
+
+def time_runs(setup, repeat):
+    times = []
+    for _ in range(repeat):
+        run = setup()
+        start = time.perf_counter()
+        run()
+        times.append(time.perf_counter() - start)
+    return {
+        'min': min(times),
+        'median': statistics.median(times),
+        'runs': times,
+    }
+
+
+def compare(results, baseline, threshold):
+    "Prints each benchmark's change from the baseline. Returns names of regressions."
+    regressions = []
+    for name, result in results.items():
+        if name not in baseline:
+            print(f'{name:24} {result["median"]:9.4f}s  (no baseline)')
+            continue
+        change = result['median'] / baseline[name]['median'] - 1
+        flag = ''
+        if change > threshold:
+            regressions.append(name)
+            flag = '  REGRESSION'
+        print(f'{name:24} {result["median"]:9.4f}s  {change:+7.1%}{flag}')
+    return regressions
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('names', metavar='name', nargs='*',
+                        help='benchmarks to run (default: all)')
+    parser.add_argument('-n', '--repeat', type=int, default=5,
+                        help='runs per benchmark (default: %(default)s)')
+    parser.add_argument('-o', '--output', default=os.path.join(BENCH_DIR, 'results.json'),
+                        help='results file to write (default: %(default)s)')
+    parser.add_argument('-b', '--baseline', default=os.path.join(BENCH_DIR, 'baseline.json'),
+                        help='results file to compare against (default: %(default)s)')
+    parser.add_argument('--save-baseline', action='store_true',
+                        help='also write the results to the baseline file')
+    parser.add_argument('-t', '--threshold', type=float, default=0.1,
+                        help='relative slowdown flagged as a regression (default: %(default)s)')
+    parser.add_argument('-l', '--list', action='store_true',
+                        help='list benchmark names and exit')
+    args = parser.parse_args()
+
+    benches = benchmarks()
+    if args.list:
+        print('\n'.join(benches))
+        return 0
+    unknown = set(args.names) - set(benches)
+    if unknown:
+        parser.error(f'unknown benchmark(s): {", ".join(sorted(unknown))}')
+
+    results = {name: time_runs(setup, args.repeat)
+               for name, setup in benches.items()
+               if not args.names or name in args.names}
+    report = {
+        'python': platform.python_implementation() + ' ' + platform.python_version(),
+        'machine': platform.machine(),
+        'repeat': args.repeat,
+        'benchmarks': results,
+    }
+    for path in (args.output, args.baseline) if args.save_baseline else (args.output,):
+        with open(path, 'w') as f:
+            json.dump(report, f, indent=2)
+
+    baseline = {}
+    if not args.save_baseline and os.path.exists(args.baseline):
+        with open(args.baseline) as f:
+            baseline = json.load(f)['benchmarks']
+    return 1 if compare(results, baseline, args.threshold) else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,20 @@
+;; Builds lists with quasiquote splicing and `concat`, then walks them.
+
+(defun build (n acc)
+  (if (= n 0)
+      acc
+    (build (- n 1) `(~n ~@acc))))
+
+(defun sum (xs acc)
+  (if (empty? xs)
+      acc
+    (sum (rest xs) (+ acc (first xs)))))
+
+(sum (build 3000 '()) 0)
+
+(defun build-concat (n acc)
+  (if (= n 0)
+      acc
+    (build-concat (- n 1) (concat acc (list n n)))))
+
+(count (build-concat 500 '()))
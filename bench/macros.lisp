@@ -0,0 +1,15 @@
+;; Calls through code that leans on core macros: `let`, `or`, `and`.
+
+(defun classify (n)
+  (let ((small (or (= n 0) (= n 1) (= n 2)))
+        (big (and (not (= n 0)) (not (= n 1)) (not (= n 2)))))
+    (or (and small 'small)
+        (and big 'big))))
+
+(defun loop (n)
+  (let ((x (classify n)))
+    (if (= n 0)
+        x
+      (loop (- n 1)))))
+
+(loop 2000)
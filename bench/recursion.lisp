@@ -0,0 +1,17 @@
+;; Non-tail recursive calls, then a long tail-recursive loop.
+
+(defun fib (n)
+  (if (= n 0)
+      0
+    (if (= n 1)
+        1
+      (+ (fib (- n 1)) (fib (- n 2))))))
+
+(fib 18)
+
+(defun count-down (n)
+  (if (= n 0)
+      'done
+    (count-down (- n 1))))
+
+(count-down 20000)
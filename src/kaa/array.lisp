@@ -0,0 +1,30 @@
+;; kaa.array
+;; Numeric arrays with bulk operations, backed by NumPy if it's installed
+
+(import py/kaa.array as impl)
+
+;; Construction and conversion
+(def array? impl/is_array)
+(def from-list impl/from_list)
+(def to-list impl/to_list)
+(def range impl/range_)
+(def zeros impl/zeros)
+
+;; Elements and views
+(def get impl/get)
+(def set impl/set_)
+(def slice impl/slice_)
+
+;; Elementwise arithmetic; either arg may be a number
+(def add impl/add)
+(def sub impl/sub)
+(def mul impl/mul)
+(def div impl/div)
+(def neg impl/neg)
+
+;; Reductions
+(def sum impl/sum_)
+(def prod impl/prod)
+(def min impl/min_)
+(def max impl/max_)
+(def mean impl/mean)
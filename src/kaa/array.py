@@ -0,0 +1,202 @@
+"""
+Numeric arrays for the `kaa.array` namespace.
+
+Arrays are NumPy arrays if NumPy is installed. Otherwise they're `Array`s,
+which implement the subset of the NumPy array API used here over the stdlib
+`array` module. Either way, slices are views that share their parent's
+storage.
+"""
+import array as stdlib_array
+import operator
+
+from kaa.core import List
+
+try:
+    import numpy
+except ImportError:
+    numpy = None
+
+
+# Element types, by the name used from Lisp
+TYPECODES = {'int': 'q', 'float': 'd'}
+
+
+class Array:
+    "Typed numeric array over a stdlib `array.array`, for when NumPy isn't available."
+
+    def __init__(self, data, indices=None):
+        self.data = data
+        # Positions of this array's elements in `data`
+        self.indices = range(len(data)) if indices is None else indices
+
+    def __len__(self):
+        return len(self.indices)
+
+    def __iter__(self):
+        if self.indices == range(len(self.data)):
+            return iter(self.data)
+        return map(self.data.__getitem__, self.indices)
+
+    def __getitem__(self, k):
+        if isinstance(k, slice):
+            return Array(self.data, self.indices[k])
+        return self.data[self.indices[k]]
+
+    def __setitem__(self, i, value):
+        self.data[self.indices[i]] = value
+
+    def __repr__(self):
+        return f'array({self.tolist()!r})'
+
+    def _elementwise(self, op, other, reverse=False):
+        xs = iter(self)
+        ys = iter(other) if isinstance(other, Array) else None
+        if ys is not None and len(other) != len(self):
+            raise ValueError(f'arrays of different lengths: {len(self)} and {len(other)}')
+        if reverse:
+            values = [op(other, x) for x in xs] if ys is None else list(map(op, ys, xs))
+        else:
+            values = [op(x, other) for x in xs] if ys is None else list(map(op, xs, ys))
+        return Array(stdlib_array.array(_typecode(values), values))
+
+    def __add__(self, other):
+        return self._elementwise(operator.add, other)
+
+    def __radd__(self, other):
+        return self._elementwise(operator.add, other, reverse=True)
+
+    def __sub__(self, other):
+        return self._elementwise(operator.sub, other)
+
+    def __rsub__(self, other):
+        return self._elementwise(operator.sub, other, reverse=True)
+
+    def __mul__(self, other):
+        return self._elementwise(operator.mul, other)
+
+    def __rmul__(self, other):
+        return self._elementwise(operator.mul, other, reverse=True)
+
+    def __truediv__(self, other):
+        return self._elementwise(operator.truediv, other)
+
+    def __rtruediv__(self, other):
+        return self._elementwise(operator.truediv, other, reverse=True)
+
+    def __neg__(self):
+        return self._elementwise(operator.mul, -1)
+
+    def tolist(self):
+        return list(self)
+
+    def sum(self):
+        return sum(self)
+
+    def prod(self):
+        result = 1
+        for x in self:
+            result *= x
+        return result
+
+    def min(self):
+        return min(self)
+
+    def max(self):
+        return max(self)
+
+    def mean(self):
+        if not self:
+            raise ValueError('mean of empty array')
+        return self.sum() / len(self)
+
+
+def _typecode(values):
+    return 'q' if all(isinstance(x, int) for x in values) else 'd'
+
+
+def _scalar(val):
+    "Converts NumPy scalars to Python numbers."
+    return val.item() if hasattr(val, 'item') else val
+
+
+def from_list(xs, element_type=None):
+    """
+    Returns a new array of the numbers in `xs`. `element_type` is "int" or
+    "float"; by default it's int if all the numbers are ints.
+    """
+    values = list(xs)
+    typecode = TYPECODES[element_type] if element_type else _typecode(values)
+    if numpy is not None:
+        return numpy.array(values, dtype=typecode)
+    return Array(stdlib_array.array(typecode, values))
+
+
+def to_list(arr):
+    return List(arr.tolist())
+
+
+def zeros(n, element_type='float'):
+    typecode = TYPECODES[element_type]
+    if numpy is not None:
+        return numpy.zeros(n, dtype=typecode)
+    return Array(stdlib_array.array(typecode, bytes(n * stdlib_array.array(typecode).itemsize)))
+
+
+def range_(start, stop=None, step=1):
+    "Returns an int array of a range of numbers, like Python's `range`."
+    if stop is None:
+        start, stop = 0, start
+    if numpy is not None:
+        return numpy.arange(start, stop, step, dtype='q')
+    return Array(stdlib_array.array('q', range(start, stop, step)))
+
+
+def is_array(val):
+    return isinstance(val, Array) or (numpy is not None and isinstance(val, numpy.ndarray))
+
+
+def get(arr, i):
+    return _scalar(arr[i])
+
+
+def set_(arr, i, value):
+    "Sets element `i` of `arr`, returning `arr`."
+    arr[i] = value
+    return arr
+
+
+def slice_(arr, start, stop=None, step=None):
+    "Returns a view of part of `arr`. Changes to either are visible in the other."
+    return arr[start:stop:step]
+
+
+# Elementwise arithmetic. Either arg may be a number rather than an array.
+add = operator.add
+sub = operator.sub
+mul = operator.mul
+div = operator.truediv
+
+
+def neg(arr):
+    return -arr
+
+
+# Reductions
+def sum_(arr):
+    return _scalar(arr.sum())
+
+
+def prod(arr):
+    return _scalar(arr.prod())
+
+
+def min_(arr):
+    return _scalar(arr.min())
+
+
+def max_(arr):
+    return _scalar(arr.max())
+
+
+def mean(arr):
+    return _scalar(arr.mean())
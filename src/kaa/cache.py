@@ -0,0 +1,73 @@
+"""
+Cache of the forms read from namespace source files, so loading a namespace
+needn't tokenize its source again.
+
+Like Python's `__pycache__`, cached forms are kept in a `__kaacache__`
+directory beside the source file, and are stale once the source's mtime or
+size changes. Nothing is written if `sys.dont_write_bytecode` is set.
+"""
+import os
+import pickle
+import sys
+import tempfile
+
+from kaa.reader import Reader
+
+CACHE_DIR = '__kaacache__'
+# Bump whenever the reader or the pickled classes change
+CACHE_VERSION = 2
+
+
+def read_forms(path):
+    """
+    Returns the forms in the source file at `path`, read without resolving
+    symbols (see `kaa.reader.resolve_symbols`).
+    """
+    stat = os.stat(path)
+    key = (CACHE_VERSION, stat.st_mtime_ns, stat.st_size)
+    cached = cache_path(path)
+    forms = _load(cached, key)
+    if forms is None:
+        with open(path, encoding='utf-8') as f:
+            forms = list(Reader(None).read_file(f))
+        if not sys.dont_write_bytecode:
+            _save(cached, key, forms)
+    return forms
+
+
+def cache_path(path):
+    dirname, filename = os.path.split(path)
+    name = os.path.splitext(filename)[0]
+    return os.path.join(dirname, CACHE_DIR, f'{name}.{sys.implementation.cache_tag}.pickle')
+
+
+def _load(cached, key):
+    try:
+        with open(cached, 'rb') as f:
+            if pickle.load(f) != key:
+                return None
+            return pickle.load(f)
+    except FileNotFoundError:
+        return None
+    except Exception:  # pylint: disable=broad-except
+        # Unreadable or incompatible cache; it's rewritten after reading the source
+        return None
+
+
+def _save(cached, key, forms):
+    dirname = os.path.dirname(cached)
+    try:
+        os.makedirs(dirname, exist_ok=True)
+        # Write to a temporary file first so other processes never load a partial cache
+        fd, tmp_path = tempfile.mkstemp(dir=dirname, suffix='.tmp')
+        try:
+            with os.fdopen(fd, 'wb') as f:
+                pickle.dump(key, f, pickle.HIGHEST_PROTOCOL)
+                pickle.dump(forms, f, pickle.HIGHEST_PROTOCOL)
+            os.replace(tmp_path, cached)
+        except BaseException:
+            os.unlink(tmp_path)
+            raise
+    except OSError:
+        # e.g. read-only install; just go without the cache
+        pass
@@ -0,0 +1,267 @@
+import sys
+from types import FunctionType
+
+from kaa import hooks
+from kaa.core import BINARY_OPS, Symbol
+from kaa.env import UNBOUND
+from kaa.evaluator import await_, bind_params, Evaluator, lookup_global, lookup_py, TailCall, \
+    UnboundSymbol
+from kaa.parser import Await, Call, Def, Global, If, Import, Lambda, Local, Macro, parse, Quote, \
+    Raise, Try
+
+
+class Compiler:
+    """
+    Alternative to `Evaluator` that compiles each parsed node into a Python
+    closure once, then executes forms by calling those closures.
+
+    Compiled closures take the current frame (see `Evaluator.env`) as their
+    only argument.
+    """
+
+    def __init__(self, ns, env=None):
+        self.ns = ns
+        self.env = env
+
+    def evaluate(self, expr):
+        "Compile and run some s-expression or parsed node."
+        return self.compile(parse(expr, self.ns.scope))(self.env)
+
+    def evaluate_all(self, exprs):
+        "Evaluate a sequence of expressions, returning the result of the last one."
+        result = None
+        for expr in exprs:
+            result = self.evaluate(expr)
+        return result
+
+    def compile(self, node, tail=False):
+        """
+        Returns a closure that evaluates `node` when called with a frame.
+        In tail position, calls to compiled lambdas return a `TailCall` instead.
+        """
+        if tail and type(node) in TAIL_COMPILERS:
+            compiled = TAIL_COMPILERS[type(node)](self, node, tail=True)
+        elif type(node) in COMPILERS:
+            compiled = COMPILERS[type(node)](self, node)
+        else:
+            return lambda env: node
+        # Only trace code compiled while a 'form' hook is registered
+        if hooks.FORM_HOOKS and type(node) in hooks.FORM_NODES:
+            return trace(compiled, node)
+        return compiled
+
+    def compile_body(self, nodes):
+        "Compile a lambda body. The last expression is compiled in tail position."
+        compiled = tuple(self.compile(node, tail=i == len(nodes) - 1)
+                         for i, node in enumerate(nodes))
+        if not compiled:
+            return lambda env: None
+        if len(compiled) == 1:
+            return compiled[0]
+
+        def run(env):
+            for c in compiled[:-1]:
+                c(env)
+            return compiled[-1](env)
+        return run
+
+    def compile_await(self, node):
+        expr = self.compile(node.expr)
+        return lambda env: await_(expr(env))
+
+    def compile_call(self, node, tail=False):
+        fn = self.compile(node.fn)
+        ns = self.ns
+        compiled_args = None
+        expanded_macro, expansion = None, None
+
+        def run(env):
+            nonlocal compiled_args, expanded_macro, expansion
+            f = fn(env)
+            if isinstance(f, Macro):
+                if f is not expanded_macro:
+                    expansion = self.compile(Evaluator(ns).expand(node, f), tail)
+                    expanded_macro = f
+                return expansion(env)
+            if compiled_args is None:
+                compiled_args = tuple(self.compile(arg) for arg in node.args)
+            if len(compiled_args) == 2:
+                x, y = compiled_args[0](env), compiled_args[1](env)
+                # Call core arithmetic and comparisons without packing their args
+                if type(f) is FunctionType:  # pylint: disable=unidiomatic-typecheck
+                    op = BINARY_OPS.get(f)
+                    if op:
+                        return op(x, y)
+                args = [x, y]
+            else:
+                args = [arg(env) for arg in compiled_args]
+            if tail and isinstance(f, Function):
+                return TailCall(f, args)
+            if isinstance(f, Lambda):
+                # Created by `Evaluator`, e.g. while loading another namespace
+                return Evaluator(f.ns, f.lexical_env).apply(f, args)
+            return f(*args)
+        return run
+
+    def compile_def(self, node):
+        value = self.compile(node.value)
+        ns, symbol = self.ns, node.symbol
+
+        def run(env):
+            val = value(env)
+            ns[symbol] = val
+            return val
+        return run
+
+    def compile_global(self, node):
+        ns, sym, source = self.ns, node.symbol, node.source
+        cell = ns.cell(sym)
+        if cell is None:
+            return lambda env: lookup_global(ns, sym, source)
+
+        def run(env):  # pylint: disable=unused-argument
+            val = cell.value
+            if val is UNBOUND:
+                return lookup_global(ns, sym, source)
+            return val
+        return run
+
+    def compile_if(self, node, tail=False):
+        cond = self.compile(node.cond)
+        then = self.compile(node.then, tail)
+        else_ = self.compile(node.else_, tail)
+        return lambda env: then(env) if cond(env) else else_(env)
+
+    def compile_import(self, node):
+        ns = self.ns
+        return lambda env: Evaluator(ns, env).evaluate(node)
+
+    def compile_lambda(self, node):
+        ns, captures = self.ns, node.captures
+        body = self.compile_body(node.body)
+        return lambda env: Function(node, body, tuple(env[i] for i in captures), ns)
+
+    def compile_local(self, node):  # pylint: disable=no-self-use
+        index = node.index
+        return lambda env: env[index]
+
+    def compile_quote(self, node):  # pylint: disable=no-self-use
+        value = node.value
+        return lambda env: value
+
+    def compile_raise(self, node):
+        ex = self.compile(node.ex)
+
+        def run(env):
+            val = ex(env)
+            if isinstance(val, str):
+                raise RuntimeError(val)
+            raise val
+        return run
+
+    def compile_symbol(self, sym):  # pylint: disable=no-self-use
+        # The parser only leaves `py/…` symbols as symbols
+        try:
+            val = lookup_py(sym)
+        except UnboundSymbol:
+            # Only an error if it's evaluated
+            return lambda env: lookup_py(sym)
+        return lambda env: val
+
+    def compile_try(self, node):
+        expr = self.compile(node.expr)
+        handlers = tuple((self.compile(ex_type), self.compile(handler))
+                         for ex_type, handler in node.handlers)
+
+        def run(env):
+            try:
+                return expr(env)
+            except:  # pylint: disable=bare-except
+                ex = sys.exc_info()[1]
+                for ex_type, handler in handlers:
+                    if isinstance(ex, ex_type(env)):
+                        return handler(env)
+                raise
+        return run
+
+
+COMPILERS = {
+    Await: Compiler.compile_await,
+    Call: Compiler.compile_call,
+    Def: Compiler.compile_def,
+    Global: Compiler.compile_global,
+    If: Compiler.compile_if,
+    Import: Compiler.compile_import,
+    Lambda: Compiler.compile_lambda,
+    Local: Compiler.compile_local,
+    Quote: Compiler.compile_quote,
+    Raise: Compiler.compile_raise,
+    Symbol: Compiler.compile_symbol,
+    Try: Compiler.compile_try,
+}
+
+TAIL_COMPILERS = {
+    Call: Compiler.compile_call,
+    If: Compiler.compile_if,
+}
+
+
+def trace(compiled, node):
+    """
+    Wraps the closure compiled for a special form, to notify the hooks
+    registered when it's run, if any.
+    """
+    def run(env):
+        form_hooks = hooks.FORM_HOOKS
+        if not form_hooks:
+            return compiled(env)
+        return hooks.trace_form(form_hooks, lambda node: compiled(env), node)
+    return run
+
+
+class Function:
+    """
+    A compiled lambda. Callable from Python like any other function. `node` is
+    the `Lambda` it was compiled from, in namespace `ns`.
+    """
+
+    def __init__(self, node, body, captured, ns):
+        self.node = node
+        self.params = node.params
+        self.body = body
+        self.captured = captured
+        self.ns = ns
+        # Most lambdas only take required params, and can skip `bind_params`
+        self.simple = not (self.params.optional or self.params.rest)
+
+    @property
+    def name(self):
+        return self.node.name
+
+    @property
+    def source(self):
+        return self.node.source
+
+    def __call__(self, *args):
+        fn, call_hooks = self, hooks.CALL_HOOKS
+        # Trampoline, as in `Evaluator.apply`
+        while True:
+            if call_hooks:
+                hooks.enter(call_hooks, 'call', fn, fn.source)
+            try:
+                result = fn.body(fn.bind(args))
+            finally:
+                if call_hooks:
+                    hooks.exit_(call_hooks, 'call', fn, fn.source)
+            if type(result) is not TailCall:  # pylint: disable=unidiomatic-typecheck
+                return result
+            fn, args = result
+
+    def bind(self, args):
+        "Returns a frame for a call with the given args."
+        if self.simple and len(args) == len(self.params.required):
+            frame = list(args)
+        else:
+            frame = bind_params(self.params, args)
+        frame.extend(self.captured)
+        return frame
@@ -3,20 +3,33 @@
 (def count py/len)
 (def * builtins/mul)
 (def + builtins/add)
+(def - builtins/sub)
 (def / builtins/div)
+(def < builtins/lt)
+(def <= builtins/le)
 (def = builtins/eql)
+(def > builtins/gt)
+(def >= builtins/ge)
 (def concat builtins/concat)
 (def empty? builtins/empty)
+(def filter builtins/filter_)
 (def first builtins/first)
+(def lazy-seq? builtins/is_lazy_seq)
+(def lines builtins/lines)
 (def list builtins/list_)
 (def list? builtins/is_list)
+(def map builtins/map_)
 (def not builtins/not_)
 (def print builtins/print_)
 (def println builtins/println)
+(def range builtins/range_)
+(def reduce builtins/reduce_)
 (def rest builtins/rest)
 (def str builtins/str_)
 (def symbol builtins/symbol)
 (def symbol? builtins/is_symbol)
+(def take builtins/take)
+(def to-list builtins/to_list)
 
 (defmacro and (&rest conds)
   (if conds
@@ -51,12 +64,7 @@
          ~(first (rest (first bindings)))))
     `(do ~@body)))
 
-(def *gensym-counter* 0)
-
-(defun gensym (&optional prefix)
-  (let ((next-value *gensym-counter*))
-    (def *gensym-counter* (+ *gensym-counter* 1))
-    (symbol (str (if prefix prefix "G") "__" next-value))))
+(def gensym builtins/gensym)
 
 (defmacro or (&rest conds)
   (if conds
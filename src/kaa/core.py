@@ -1,5 +1,8 @@
+from collections.abc import Sequence
 from functools import reduce
+from itertools import chain, count, islice
 import json
+import operator
 
 
 def serialize(val):
@@ -8,57 +11,208 @@ def serialize(val):
     return json.dumps(val) if isinstance(val, str) else repr(val)
 
 
-class List(list):
+class List(Sequence):
+    """
+    Immutable list of forms or values. Slices that run to the end of a list,
+    e.g. `rest`, share its items instead of copying them.
+    """
+
     def __init__(self, items=(), meta=None):
-        super().__init__(items)
+        self.items = tuple(items)
+        self.start = 0
         self.meta = meta or {}
 
+    @classmethod
+    def _view(cls, items, start):
+        l = cls.__new__(cls)
+        l.items = items
+        l.start = start
+        l.meta = {}
+        return l
+
     def __str__(self):
         return '(%s)' % ' '.join(map(str, self))
 
     def __repr__(self):
         return '(%s)' % ' '.join(map(serialize, self))
 
-    # Ensure slicing returns new List instance
+    def __len__(self):
+        return len(self.items) - self.start
+
+    def __iter__(self):
+        if self.start == 0:
+            return iter(self.items)
+        return map(self.items.__getitem__, range(self.start, len(self.items)))
+
     def __getitem__(self, k):
-        val = super().__getitem__(k)
-        return List(super().__getitem__(k)) if isinstance(k, slice) else val
+        if isinstance(k, slice):
+            start, stop, step = k.indices(len(self))
+            if step == 1 and stop == len(self):
+                return List._view(self.items, self.start + start)
+            return List(self.items[self.start:][k])
+        if k < 0:
+            k += len(self)
+            if k < 0:
+                raise IndexError('list index out of range')
+        return self.items[self.start + k]
+
+    def __eq__(self, other):
+        if not isinstance(other, (List, list, tuple)):
+            return NotImplemented
+        return len(self) == len(other) and all(x == y for x, y in zip(self, other))
+
+    __hash__ = None
+
+    def __add__(self, other):
+        return List(chain(self, other))
 
 
 class Symbol:
-    def __init__(self, name, ns=None, meta=None):
+    """
+    Symbols are interned: there's a single `Symbol` for each name and ns, so
+    they compare and hash by identity. As they're shared, symbols don't record
+    where they were read; the reader keeps that in the `sources` meta of the
+    list that contains them.
+
+    Interned symbols last as long as the process, so symbols made in bulk at
+    runtime, such as by `gensym`, are `uninterned` instead.
+    """
+
+    __slots__ = ('name', 'ns')
+
+    _interned = {}  # (name, ns) -> Symbol
+
+    def __new__(cls, name, ns=None):
+        sym = Symbol._interned.get((name, ns))
+        if sym is None:
+            sym = Symbol.uninterned(name, ns)
+            # If threads race to intern a symbol, they all get the first one
+            sym = Symbol._interned.setdefault((name, ns), sym)
+        return sym
+
+    @staticmethod
+    def uninterned(name, ns=None):
+        "Returns a new symbol that's only equal to itself, not interned ones of the same name."
         assert isinstance(name, str)
         assert ns is None or isinstance(ns, str)
-        self.name = name
-        self.ns = ns
-        self.meta = meta or {}
+        sym = object.__new__(Symbol)
+        sym.name = name  # pylint: disable=attribute-defined-outside-init
+        sym.ns = ns  # pylint: disable=attribute-defined-outside-init
+        return sym
+
+    def __reduce__(self):
+        # Unpickling and copying re-intern, preserving identity
+        if Symbol._interned.get((self.name, self.ns)) is self:
+            return (Symbol, (self.name, self.ns))
+        return (Symbol.uninterned, (self.name, self.ns))
 
     def in_ns(self, ns):
-        return Symbol(self.name, ns, self.meta)
+        return Symbol(self.name, ns)
 
-    def __eq__(self, other):
-        return isinstance(other, Symbol) \
-            and other.name == self.name \
-            and other.ns == self.ns
+    def __str__(self):
+        return repr(self)
 
-    def __ne__(self, other):
-        return not self == other
+    def __repr__(self):
+        return f'{self.ns}/{self.name}' if self.ns else self.name
 
-    def __hash__(self):
-        return hash((self.name, self.ns))
+
+class LazySeq:
+    """
+    Sequence whose items are pulled from an iterator as they're needed.
+
+    `first`/`rest` realise one item at a time and keep it, so a seq can be
+    traversed recursively like a `List`. Earlier items can be garbage
+    collected once nothing refers to the seqs that start with them.
+
+    Iterating from Python, as `map`, `reduce` etc. do, streams items that
+    haven't been realised straight from the iterator without keeping them.
+    Pipelines therefore run in constant memory, however long the input. The
+    streamed items can't be revisited, so traversing the seq again raises
+    `SeqConsumed`. To traverse a seq more than once, convert it with `to_list`.
+    """
+
+    __slots__ = ('_source', '_first', '_rest', '_state')
+
+    UNREALISED, REALISED, EMPTY, STREAMED = range(4)
+
+    def __init__(self, items=()):
+        self._source = iter(items)
+        self._first = None
+        self._rest = None
+        self._state = LazySeq.UNREALISED
+
+    def _realise(self):
+        if self._state == LazySeq.UNREALISED:
+            try:
+                self._first = next(self._source)
+            except StopIteration:
+                self._state = LazySeq.EMPTY
+            else:
+                self._rest = LazySeq(self._source)
+                self._state = LazySeq.REALISED
+            self._source = None
+        elif self._state == LazySeq.STREAMED:
+            raise SeqConsumed()
+
+    def first(self):
+        self._realise()
+        return self._first
+
+    def rest(self):
+        self._realise()
+        return self._rest if self._state == LazySeq.REALISED else self
+
+    def empty(self):
+        self._realise()
+        return self._state == LazySeq.EMPTY
+
+    def __bool__(self):
+        return not self.empty()
+
+    def __iter__(self):
+        seq = self
+        while True:
+            if seq._state == LazySeq.UNREALISED:
+                source, seq._source = seq._source, None
+                seq._state = LazySeq.STREAMED
+                yield from source
+                return
+            seq._realise()  # Raises if already streamed
+            if seq._state == LazySeq.EMPTY:
+                return
+            yield seq._first
+            seq = seq._rest
 
     def __str__(self):
-        return repr(self)
+        return str(List(self.realise_all()))
 
     def __repr__(self):
-        return f'{self.ns}/{self.name}' if self.ns else self.name
+        return repr(List(self.realise_all()))
+
+    def realise_all(self):
+        "Yields all items, keeping them so the seq can still be traversed."
+        seq = self
+        while not seq.empty():
+            yield seq.first()
+            seq = seq.rest()
+
+
+class SeqConsumed(ValueError):
+    def __init__(self):
+        super().__init__(
+            "lazy seq has already been iterated over, and its items weren't kept; "
+            'use `to-list` to keep them, so they can be used more than once')
 
 
 def concat(*lists):
-    return reduce(lambda x, y: List((x or []) + (y or [])), lists)
+    return List(chain.from_iterable(l for l in lists if l))
 
 
 def empty(val):
+    if is_list(val):
+        return not val
+    if isinstance(val, LazySeq):
+        return val.empty()
     try:
         next(iter(val))
     except StopIteration:
@@ -80,9 +234,17 @@ def list_(*items):
     return List(items)
 
 
+def is_lazy_seq(val):
+    return isinstance(val, LazySeq)
+
+
 def first(val):
     if val is None:
         return None
+    if is_list(val):
+        return val[0] if val else None
+    if isinstance(val, LazySeq):
+        return val.first()
     try:
         return next(iter(val))
     except StopIteration:
@@ -106,6 +268,8 @@ def rest(val):
         return None
     if is_list(val):
         return val[1:]
+    if isinstance(val, LazySeq):
+        return val.rest()
     raise ValueError(f"can't get rest of {type(val)}")
 
 
@@ -118,17 +282,122 @@ def symbol(name):
     return Symbol(str(name))
 
 
+_gensym_counter = count()
+
+
+def gensym(prefix=None):
+    """
+    Returns a new, unique symbol. It's uninterned, so it can be garbage
+    collected once unused. Safe to call from multiple threads.
+    """
+    return Symbol.uninterned(f'{prefix or "G"}__{next(_gensym_counter)}')
+
+
+def map_(f, *seqs):
+    return LazySeq(map(f, *seqs))
+
+
+def filter_(f, seq):
+    return LazySeq(filter(f, seq))
+
+
+def take(n, seq):
+    return LazySeq(islice(seq, n))
+
+
+def reduce_(f, *args):
+    "(reduce f seq) or (reduce f initial seq)"
+    if len(args) == 1:
+        return reduce(f, args[0])
+    initial, seq = args
+    return reduce(f, seq, initial)
+
+
+def range_(*args):
+    "Lazy seq of numbers, as given by Python's `range`, or all numbers from 0 if no args."
+    return LazySeq(range(*args) if args else count())
+
+
+def lines(path):
+    "Lazy seq of the lines in a file, without line endings. The file is read as needed."
+    def read():
+        with open(path, encoding='utf-8') as f:
+            for line in f:
+                yield line.rstrip('\n')
+    return LazySeq(read())
+
+
+def to_list(seq):
+    if isinstance(seq, LazySeq):
+        # Keep the items, so the seq isn't used up
+        return List(seq.realise_all())
+    return seq if is_list(seq) else List(seq)
+
+
+# Arithmetic and comparison primitives take any number of args, with fast
+# paths for the common 1- and 2-arg cases.
+
 def add(*xs):
-    return reduce(lambda acc, x: acc + x, xs, 0)
+    if len(xs) == 2:
+        return xs[0] + xs[1]
+    return reduce(operator.add, xs, 0)
 
 
-def eql(*xs):
-    return all(x == xs[0] for x in xs)
+def sub(*xs):
+    if len(xs) == 2:
+        return xs[0] - xs[1]
+    if len(xs) == 1:
+        return -xs[0]
+    if not xs:
+        raise TypeError('`-` requires 1+ args')
+    return reduce(operator.sub, xs)
 
 
 def mul(*xs):
-    return reduce(lambda acc, x: acc * x, xs, 1)
+    if len(xs) == 2:
+        return xs[0] * xs[1]
+    return reduce(operator.mul, xs, 1)
 
 
 def div(*xs):
-    return reduce(lambda acc, x: acc / x, xs, 1)
+    if len(xs) == 2:
+        return xs[0] / xs[1]
+    if len(xs) == 1:
+        return 1 / xs[0]
+    if not xs:
+        raise TypeError('`/` requires 1+ args')
+    return reduce(operator.truediv, xs)
+
+
+def eql(*xs):
+    if len(xs) == 2:
+        return xs[0] == xs[1]
+    return all(x == xs[0] for x in xs)
+
+
+def _comparison(op):
+    def compare(*xs):
+        if len(xs) == 2:
+            return op(xs[0], xs[1])
+        return all(map(op, xs, xs[1:]))
+    return compare
+
+
+lt = _comparison(operator.lt)
+gt = _comparison(operator.gt)
+le = _comparison(operator.le)
+ge = _comparison(operator.ge)
+
+
+# 2-arg equivalents of the primitives above, which engines call directly
+BINARY_OPS = {
+    add: operator.add,
+    sub: operator.sub,
+    mul: operator.mul,
+    div: operator.truediv,
+    eql: operator.eq,
+    lt: operator.lt,
+    gt: operator.gt,
+    le: operator.le,
+    ge: operator.ge,
+}
@@ -1,26 +1,12 @@
-class Environment:
-    def __init__(self, bindings=None, parent=None):
-        self.bindings = bindings or {}
-        self.parent = parent
+# Value of a cell for a symbol that's been referenced but not yet defined
+UNBOUND = object()
 
-    def __contains__(self, k):
-        return k in self.bindings or \
-            (self.parent and k in self.parent)
 
-    def __getitem__(self, k):
-        try:
-            return self.bindings[k]
-        except KeyError:
-            if self.parent:
-                return self.parent[k]
-            raise
+class Cell:
+    "Holds the value of a namespace definition, so references can cache it."
 
-    def __setitem__(self, k, val):
-        assert self.parent is None, 'attempted to set value in non-root environment'
-        self.bindings[k] = val
+    def __init__(self, value=UNBOUND):
+        self.value = value
 
-    def __iter__(self):
-        return iter(self.bindings)
-
-    def push_bindings(self, bindings=None):
-        return Environment(bindings=bindings, parent=self)
+    def is_bound(self):
+        return self.value is not UNBOUND
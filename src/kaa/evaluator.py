@@ -1,29 +1,55 @@
+import builtins
+from collections import namedtuple
+from contextvars import ContextVar
 import sys
-from itertools import chain, repeat
+from itertools import repeat
+from types import FunctionType
 
-from kaa.core import is_list, is_symbol, List
-from kaa.parser import Lambda, Macro, parse
+from kaa import hooks
+from kaa.core import BINARY_OPS, is_list, is_symbol, List
+from kaa.env import UNBOUND
+from kaa.parser import Call, If, Lambda, Macro, parse
+
+
+# A call in tail position of a lambda body, left for `Evaluator.apply` to run
+# without growing the Python stack
+TailCall = namedtuple('TailCall', 'fn args')
 
 
 class Evaluator:
     def __init__(self, ns, env=None):
         self.ns = ns
-        self.env = ns.defs if env is None else env
+        # Frame of the innermost lambda call, if any: a list of the values of
+        # its params, followed by the values it captured
+        self.env = env
 
     def evaluate(self, expr):
-        "Recursively parse and evaluate some s-expression."
-        expr = parse(expr)
-
-        # Function invocation
-        if is_list(expr) and expr:
-            return self.call(expr)
+        "Evaluate some s-expression or parsed node."
+        # Parsed nodes pass straight through; raw forms are parsed at most once
+        expr = parse(expr, self.ns.scope)
 
         evaluator = getattr(self, f'eval__{type(expr).__name__}', None)
         if evaluator:
+            form_hooks = hooks.FORM_HOOKS
+            if form_hooks:
+                return hooks.trace_form(form_hooks, evaluator, expr)
             return evaluator(expr)
 
         return expr
 
+    def evaluate_tail(self, expr):
+        "Like `evaluate`, but lambda calls in tail position are returned as `TailCall`s."
+        expr = parse(expr, self.ns.scope)
+        evaluator = self.eval__Call if isinstance(expr, Call) \
+            else self.eval__If if isinstance(expr, If) \
+            else None
+        if evaluator is None:
+            return self.evaluate(expr)
+        form_hooks = hooks.FORM_HOOKS
+        if form_hooks:
+            return hooks.trace_form(form_hooks, evaluator, expr, True)
+        return evaluator(expr, True)
+
     def evaluate_all(self, exprs):
         "Evaluate a sequence of expressions, returning the result of the last one."
         result = None
@@ -31,65 +57,127 @@ class Evaluator:
             result = self.evaluate(expr)
         return result
 
-    def call(self, expr):
-        f = self.evaluate(expr[0])
-        unevaled_args = expr[1:]
+    def evaluate_body(self, exprs):
+        "Evaluate a lambda body, leaving a call in tail position as a `TailCall`."
+        *init, last = exprs or (None,)
+        for expr in init:
+            self.evaluate(expr)
+        return self.evaluate_tail(last)
+
+    def expand(self, node, macro):
+        """
+        Expand a macro call site. The expansion is memoised on the call site,
+        and only redone if the macro is redefined; macros are assumed to depend
+        only on their args.
+        """
+        cached = node.expansion
+        if cached is None or cached[0] is not macro:
+            source = node.form.meta.get('source')
+            expansion = self.macroexpand(macro, node.form[1:], source)
+            if is_list(expansion) and source and 'source' not in expansion.meta:
+                # Attribute generated code, e.g. a `defun`'s lambda, to the call site
+                expansion.meta['source'] = source
+            expansion = parse(expansion, node.scope)
+            cached = node.expansion = (macro, expansion)
+        return cached[1]
+
+    def macroexpand(self, macro, args, source=None):
+        macro_hooks = hooks.MACRO_HOOKS
+        if macro_hooks:
+            hooks.enter(macro_hooks, 'macro', macro, source)
+        try:
+            return Evaluator(self.ns, bind_params(macro.params, args)).evaluate_all(macro.body)
+        finally:
+            if macro_hooks:
+                hooks.exit_(macro_hooks, 'macro', macro, source)
+
+    def apply(self, fn, args):  # pylint: disable=no-self-use
+        call_hooks = hooks.CALL_HOOKS
+        # Trampoline: tail calls to other lambdas are run by this loop rather
+        # than recursively, so iteration via self-calls runs in constant stack.
+        while True:
+            if call_hooks:
+                hooks.enter(call_hooks, 'call', fn, fn.source)
+            try:
+                env = bind_params(fn.params, args)
+                env.extend(fn.lexical_env)
+                result = Evaluator(fn.ns, env).evaluate_body(fn.body)
+            finally:
+                if call_hooks:
+                    hooks.exit_(call_hooks, 'call', fn, fn.source)
+            if not isinstance(result, TailCall):
+                return result
+            fn, args = result
+
+    def eval__Await(self, node):  # pylint: disable=invalid-name
+        return await_(self.evaluate(node.expr))
+
+    def eval__Call(self, node, tail=False):  # pylint: disable=invalid-name
+        f = self.evaluate(node.fn)
 
         if isinstance(f, Macro):
-            # TODO: this perhaps belongs in some separate compilation phase?
-            expansion = self.macroexpand(f, unevaled_args)
-            return self.evaluate(expansion)
-
-        evaled_args = tuple(self.evaluate(x) for x in unevaled_args)
+            expansion = self.expand(node, f)
+            return self.evaluate_tail(expansion) if tail else self.evaluate(expansion)
+
+        args = node.args
+        if len(args) == 2:
+            evaled_args = (self.evaluate(args[0]), self.evaluate(args[1]))
+            # Call core arithmetic and comparisons without packing their args
+            if type(f) is FunctionType:  # pylint: disable=unidiomatic-typecheck
+                op = BINARY_OPS.get(f)
+                if op:
+                    return op(*evaled_args)
+        else:
+            evaled_args = [self.evaluate(x) for x in args]
 
         if isinstance(f, Lambda):
-            return self.apply(f, evaled_args)
+            return TailCall(f, evaled_args) if tail else self.apply(f, evaled_args)
 
         # assume Python callable
         return f(*evaled_args)
 
-    def macroexpand(self, macro, args):
-        bindings = bind_params(macro.params, args)
-        return self.with_bindings(bindings).evaluate_all(macro.body)
-
-    def apply(self, fn, args):
-        bindings = {}
-        bindings.update(fn.lexical_env.bindings)
-        bindings.update(bind_params(fn.params, args))
-        return Evaluator(fn.ns, self.env.push_bindings(bindings)).evaluate_all(fn.body)
-
-    def with_bindings(self, bindings):
-        return Evaluator(self.ns, self.env.push_bindings(bindings))
-
     def eval__Def(self, node):  # pylint: disable=invalid-name
         val = self.evaluate(node.value)
         self.ns[node.symbol] = val
         return val
 
-    def eval__If(self, node):  # pylint: disable=invalid-name
-        if self.evaluate(node.cond):
-            return self.evaluate(node.then)
-        return self.evaluate(node.else_)
+    def eval__Global(self, node):  # pylint: disable=invalid-name
+        resolved = node.resolved
+        if resolved is None or resolved[0] is not self.ns:
+            resolved = node.resolved = (self.ns, self.ns.cell(node.symbol))
+        cell = resolved[1]
+        if cell is not None:
+            val = cell.value
+            if val is not UNBOUND:
+                return val
+        return lookup_global(self.ns, node.symbol, node.source)
+
+    def eval__If(self, node, tail=False):  # pylint: disable=invalid-name
+        branch = node.then if self.evaluate(node.cond) else node.else_
+        return self.evaluate_tail(branch) if tail else self.evaluate(branch)
 
     def eval__Import(self, node):  # pylint: disable=invalid-name
         symbols = '*' if is_symbol(node.names) and node.names.name == '*' \
             else tuple(sym.name for sym in node.names) if is_list(node.names) \
             else ()
         alias = node.alias.name if node.alias else None
-        if node.source.ns == 'py':
-            self.ns.import_module(self.ns.load_module(node.source.name), symbols, alias)
+        if node.target.ns == 'py':
+            self.ns.import_module(self.ns.load_module(node.target.name), symbols, alias)
         else:
-            self.ns.import_ns(self.ns.load_ns(node.source.name), symbols, alias)
+            self.ns.import_ns(self.ns.load_ns(node.target.name), symbols, alias)
 
     def eval__Lambda(self, node):  # pylint: disable=invalid-name
         if not node.ns:
             # The first time the lambda is taken as a value, capture:
             # - its ns, in case of side-effects in body, e.g. `(def …)`
-            # - its lexical bindings
-            # TODO: could optimise this, e.g. only capture free vars
-            return Lambda(node.params, node.body, self.ns, self.env)
+            # - the values of the enclosing locals that it references
+            captured = tuple(self.env[i] for i in node.captures)
+            return Closure(*node._replace(ns=self.ns, lexical_env=captured))
         return node
 
+    def eval__Local(self, node):  # pylint: disable=invalid-name
+        return self.env[node.index]
+
     def eval__Quote(self, node):  # pylint: disable=invalid-name, no-self-use
         return node.value
 
@@ -99,15 +187,9 @@ class Evaluator:
             raise RuntimeError(ex)
         raise ex
 
-    def eval__Symbol(self, sym):  # pylint: disable=invalid-name
-        if sym.ns == 'py':
-            return eval(sym.name) # pylint: disable=eval-used
-        for env in (self.env, self.ns):
-            try:
-                return env[sym]
-            except KeyError:
-                pass
-        raise UnboundSymbol(sym)
+    def eval__Symbol(self, sym):  # pylint: disable=invalid-name, no-self-use
+        # The parser only leaves `py/…` symbols as symbols
+        return lookup_py(sym)
 
     def eval__Try(self, node):  # pylint: disable=invalid-name
         try:
@@ -122,18 +204,91 @@ class Evaluator:
 
 
 
+class Closure(Lambda):
+    "A lambda taken as a value. Callable from Python like any other function."
+
+    __slots__ = ()
+
+    def __call__(self, *args):
+        return Evaluator(self.ns, self.lexical_env).apply(self, args)
+
+
+def lookup_global(ns, sym, source=None):
+    "Slow path for symbols without a bound namespace cell, e.g. Python module attributes."
+    try:
+        return ns[sym]
+    except KeyError:
+        raise UnboundSymbol(sym, source) from None
+
+
+# Event loop of the async evaluation running in this context, if any (see
+# `Runtime.eval_string_async`)
+EVENT_LOOP = ContextVar('EVENT_LOOP', default=None)
+
+
+def await_(awaitable):
+    """
+    Returns the result of an awaitable. In an async evaluation, which runs in
+    a worker thread, the awaitable runs on the evaluation's event loop and
+    only the worker thread waits for it. Otherwise it's run in a new loop,
+    unless this thread is already running one, which waiting would block.
+    """
+    # asyncio is slow to import, and most programs don't need it
+    import asyncio  # pylint: disable=import-outside-toplevel
+    loop = EVENT_LOOP.get()
+    if loop is None:
+        try:
+            asyncio.get_running_loop()
+        except RuntimeError:
+            return asyncio.run(_result(awaitable))
+        if asyncio.iscoroutine(awaitable):
+            # Never to be awaited
+            awaitable.close()
+        raise AwaitInRunningLoop()
+    return asyncio.run_coroutine_threadsafe(_result(awaitable), loop).result()
+
+
+async def _result(awaitable):
+    return await awaitable
+
+
+# Values of `py/…` symbols, by symbol
+PY_VALUES = {}
+
+
+def lookup_py(sym):
+    """
+    Returns the value of a `py/…` symbol: a Python builtin, or an attribute of
+    one, e.g. `py/str.upper`. Builtins aren't expected to change, so values
+    are cached.
+    """
+    try:
+        return PY_VALUES[sym]
+    except KeyError:
+        pass
+    name, *attrs = sym.name.split('.')
+    try:
+        val = getattr(builtins, name)
+        for attr in attrs:
+            val = getattr(val, attr)
+    except AttributeError:
+        raise UnboundSymbol(sym) from None
+    PY_VALUES[sym] = val
+    return val
+
+
 def bind_params(params, args):
+    "Returns frame slot values for `args`, in the order given by `param_names`."
     check_arity(params, args)
 
-    bindings = dict(zip(params.required, args))
-
-    bindings.update(zip(params.optional, chain(args[len(params.required):], repeat(None))))
+    num_positional = len(params.required) + len(params.optional)
+    values = list(args[:num_positional])
+    values.extend(repeat(None, num_positional - len(values)))
 
     if params.rest:
-        num_consumed = len(params.required) + len(params.optional)
-        bindings[params.rest] = List(args[num_consumed:])
+        values.append(List(args[num_positional:]))
 
-    return bindings
+    return values
 
 
 def check_arity(params, args):
@@ -159,8 +314,13 @@ class WrongArity(Exception):
     pass
 
 
+class AwaitInRunningLoop(Exception):
+    def __init__(self):
+        super().__init__('`await` would block the running event loop; '
+                         'use `Runtime.eval_string_async` to evaluate from a coroutine')
+
+
 # TODO: should this be NameError, like Python?
 class UnboundSymbol(Exception):
-    def __init__(self, sym):
-        msg = f'{sym} at {sym.meta["source"]}' if 'source' in sym.meta else str(sym)
-        super().__init__(msg)
+    def __init__(self, sym, source=None):
+        super().__init__(f'{sym} at {source}' if source else str(sym))
@@ -0,0 +1,194 @@
+"""
+Fork server, so `kaa` commands start without loading kaa and its namespaces.
+
+`kaa --server=PATH` loads kaa and `kaa.core`, plus any `--preload`
+namespaces, then listens on a Unix socket at PATH. When `KAA_SERVER` is set
+to PATH, `kaa` sends its args, working directory, environment, `sys.path`
+and standard streams to the server instead of running them itself. The
+server forks a child, which runs them with those streams, then reports its
+exit status. If the server isn't running, `kaa` runs as usual.
+
+A child starts with a copy of the server's loaded namespaces, so changes to
+namespace files are only seen once the server is restarted. Other
+namespaces are found on the client's `sys.path`, as they would be locally.
+
+The client forwards SIGINT, SIGTERM and SIGHUP, e.g. from Ctrl-C or
+`timeout`, to the child, and if they kill the child, the client dies of
+the same signal. A client that's killed outright, e.g. with SIGKILL, leaves
+its child running.
+
+This module only imports a few small standard modules, so that the client
+is quick to start. As the client and server are the same kaa, requests are
+encoded with `marshal`.
+"""
+import marshal
+import os
+import signal
+import socket
+import struct
+import sys
+import traceback
+
+# Encodes the lengths, pids and exit statuses sent over the socket
+INT = struct.Struct('!i')
+STDIO = (0, 1, 2)
+FORWARDED_SIGNALS = (signal.SIGINT, signal.SIGTERM, signal.SIGHUP)
+
+
+def request(path, args):
+    """
+    Runs `kaa args` in the server listening at `path`, with this process's
+    working directory, environment, `sys.path` and standard streams. Returns
+    the exit status, or None if there's no server.
+    """
+    sock = socket.socket(socket.AF_UNIX)
+    try:
+        try:
+            sock.connect(path)
+        except (FileNotFoundError, ConnectionRefusedError):
+            return None
+        with _SignalForwarder() as forwarder:
+            body = marshal.dumps({'args': args, 'cwd': os.getcwd(), 'env': dict(os.environ),
+                                  'path': sys.path})
+            socket.send_fds(sock, [INT.pack(len(body))], STDIO)
+            sock.sendall(body)
+            forwarder.set_pid(INT.unpack(_recv_exactly(sock, INT.size))[0])
+            try:
+                return INT.unpack(_recv_exactly(sock, INT.size))[0]
+            except ConnectionError:
+                if not forwarder.received:
+                    raise
+                # The child was killed by a forwarded signal, so die of it too
+                signum = forwarder.received[-1]
+                signal.signal(signum, signal.SIG_DFL)
+                os.kill(os.getpid(), signum)
+                raise
+    finally:
+        sock.close()
+
+
+class _SignalForwarder:
+    """
+    Forwards `FORWARDED_SIGNALS` received by the client to its child, once the
+    child's pid is known. Signals received before then are forwarded late.
+    """
+
+    def __init__(self):
+        self.pid = None
+        self.received = []
+        self.handlers = {}
+
+    def __enter__(self):
+        self.handlers = {signum: signal.signal(signum, self.forward)
+                         for signum in FORWARDED_SIGNALS}
+        return self
+
+    def __exit__(self, *exc_info):
+        for signum, handler in self.handlers.items():
+            signal.signal(signum, handler)
+
+    def set_pid(self, pid):
+        self.pid = pid
+        for signum in list(self.received):
+            self.kill(signum)
+
+    def forward(self, signum, _frame):
+        self.received.append(signum)
+        if self.pid is not None:
+            self.kill(signum)
+
+    def kill(self, signum):
+        try:
+            os.kill(self.pid, signum)
+        except ProcessLookupError:
+            pass  # The child has just exited
+
+
+def serve(path, run):
+    "Serves requests to `run` a list of args, at a Unix socket at `path`."
+    # Forked children are reaped automatically
+    signal.signal(signal.SIGCHLD, signal.SIG_IGN)
+    # Clean up on `kill`, as well as Ctrl-C
+    signal.signal(signal.SIGTERM, lambda *_: sys.exit(0))
+    listener = socket.socket(socket.AF_UNIX)
+    # Only create `path` once it's listening, so clients needn't retry
+    tmp_path = f'{path}.{os.getpid()}'
+    listener.bind(tmp_path)
+    listener.listen()
+    os.replace(tmp_path, path)
+    try:
+        while True:
+            conn, _ = listener.accept()
+            if os.fork() == 0:
+                # Whatever happens, the child mustn't return into the server's
+                # loop, or clean up its socket
+                status = 1
+                try:
+                    listener.close()
+                    signal.signal(signal.SIGCHLD, signal.SIG_DFL)
+                    signal.signal(signal.SIGTERM, signal.SIG_DFL)
+                    status = _handle(conn, run)
+                finally:
+                    os._exit(status)  # pylint: disable=protected-access
+            conn.close()
+    finally:
+        listener.close()
+        os.unlink(path)
+
+
+def _handle(conn, run):
+    "Runs a request in a forked child. Returns its exit status."
+    try:
+        header, fds, _, _ = socket.recv_fds(conn, INT.size, len(STDIO))
+        request_ = marshal.loads(_recv_exactly(conn, INT.unpack(header)[0]))
+        for fd, stdio_fd in zip(fds, STDIO):
+            os.dup2(fd, stdio_fd)
+            os.close(fd)
+        os.chdir(request_['cwd'])
+        os.environ.clear()
+        os.environ.update(request_['env'])
+        sys.path[:] = request_['path']
+        sys.argv[1:] = request_['args']
+        # So the client can forward signals
+        conn.sendall(INT.pack(os.getpid()))
+    except Exception:  # pylint: disable=broad-except
+        traceback.print_exc()
+        return 1
+
+    try:
+        run(request_['args'])
+        status = 0
+    except SystemExit as ex:
+        status = _exit_status(ex)
+    except KeyboardInterrupt:
+        traceback.print_exc()
+        status = 128 + signal.SIGINT
+    except BaseException:  # pylint: disable=broad-except
+        traceback.print_exc()
+        status = 1
+    finally:
+        sys.stdout.flush()
+        sys.stderr.flush()
+    try:
+        conn.sendall(INT.pack(status))
+    except BrokenPipeError:
+        pass  # The client has gone
+    return status
+
+
+def _exit_status(ex):
+    "Exit status for a `SystemExit`, printing its message, if any, as the interpreter would."
+    if ex.code is None or isinstance(ex.code, int):
+        return ex.code or 0
+    print(ex.code, file=sys.stderr)
+    return 1
+
+
+def _recv_exactly(sock, size):
+    data = b''
+    while len(data) < size:
+        chunk = sock.recv(size - len(data))
+        if not chunk:
+            raise ConnectionError('connection closed')
+        data += chunk
+    return data
@@ -0,0 +1,85 @@
+"""
+Instrumentation hooks, for tracers, profilers, coverage tools and the like.
+
+A hook is notified on entry to and exit from:
+
+- 'call': a lambda call. `target` is the lambda, `source` where it's defined.
+- 'macro': a macro expansion. `target` is the macro, `source` the call site.
+- 'form': evaluation of a special form. `target` is the parsed node, e.g. an
+  `If`, and `source` the location of the form.
+
+Hooks are notified of events in every thread.
+
+Engines check for hooks once per call or form, so they cost next to nothing
+while none are registered. The compiler decides whether to trace special
+forms when it compiles them, so code compiled before a 'form' hook is
+registered doesn't report to it. Code compiled while one is registered
+checks for hooks each time it runs, so stops reporting once they're
+unregistered.
+"""
+from threading import Lock
+
+from kaa.parser import Await, Def, If, Import, Lambda, Quote, Raise, Try
+
+# Node types reported as 'form' events
+FORM_NODES = frozenset((Await, Def, If, Import, Lambda, Quote, Raise, Try))
+
+# Registered hooks interested in each kind of event
+CALL_HOOKS = ()
+MACRO_HOOKS = ()
+FORM_HOOKS = ()
+
+_registered = []
+_lock = Lock()
+
+
+class Hook:
+    "Base class for hooks. `events` are the kinds of event it's notified of."
+
+    events = ('call', 'macro', 'form')
+
+    def enter(self, event, target, source):
+        pass
+
+    def exit(self, event, target, source):
+        pass
+
+
+def register(hook):
+    with _lock:
+        _registered.append(hook)
+        _update()
+
+
+def unregister(hook):
+    with _lock:
+        _registered.remove(hook)
+        _update()
+
+
+def _update():
+    global CALL_HOOKS, MACRO_HOOKS, FORM_HOOKS  # pylint: disable=global-statement
+    CALL_HOOKS = tuple(hook for hook in _registered if 'call' in hook.events)
+    MACRO_HOOKS = tuple(hook for hook in _registered if 'macro' in hook.events)
+    FORM_HOOKS = tuple(hook for hook in _registered if 'form' in hook.events)
+
+
+def enter(hooks, event, target, source):
+    for hook in hooks:
+        hook.enter(event, target, source)
+
+
+def exit_(hooks, event, target, source):
+    for hook in hooks:
+        hook.exit(event, target, source)
+
+
+def trace_form(hooks, evaluate, node, *args):
+    "Returns `evaluate(node, *args)`, notifying `hooks` if `node` is a special form."
+    if type(node) not in FORM_NODES:
+        return evaluate(node, *args)
+    enter(hooks, 'form', node, node.source)
+    try:
+        return evaluate(node, *args)
+    finally:
+        exit_(hooks, 'form', node, node.source)
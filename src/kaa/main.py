@@ -1,11 +1,28 @@
-import argparse
+import os
 import sys
 
-from kaa.repl import Repl
-from kaa.runtime import Runtime
+from kaa import forkserver
 
 
 def main():
+    server = os.environ.get('KAA_SERVER')
+    if server:
+        status = forkserver.request(server, sys.argv[1:])
+        if status is not None:
+            sys.exit(status)
+    run(sys.argv[1:])
+
+
+def run(argv):
+    # Only imported if there's no server to run in, so the client starts quickly
+    # pylint: disable=import-outside-toplevel
+    import argparse
+
+    from kaa.ns import REGISTRY
+    from kaa.profiler import Profiler
+    from kaa.repl import Repl
+    from kaa.runtime import ENGINES, Runtime
+
     parser = argparse.ArgumentParser()
 
     parser.add_argument('paths',
@@ -16,23 +33,65 @@ def main():
     parser.add_argument('-e', '--expression',
                         help='lisp expression to evaluate')
 
+    parser.add_argument('--engine',
+                        choices=ENGINES,
+                        default='evaluator',
+                        help='execution engine (default: %(default)s)')
+
+    parser.add_argument('--profile',
+                        action='store_true',
+                        help='print time spent in each lisp function to stderr')
+
+    parser.add_argument('--profile-stacks',
+                        metavar='PATH',
+                        help='with --profile, also write collapsed stacks for flame graphs')
+
+    parser.add_argument('--server',
+                        metavar='PATH',
+                        help='run a fork server at Unix socket PATH, for clients with '
+                             'KAA_SERVER=PATH to start in')
+
+    parser.add_argument('--preload',
+                        metavar='NS',
+                        action='append',
+                        default=[],
+                        help='with --server, also load namespace NS before serving')
+
     # parser.add_argument('-d', '--debug',
     #                     help='interpreter debug mode',
     #                     action='store_true')
 
-    args = parser.parse_args()
-
-    if args.expression:
-        Runtime().eval_string(args.expression)
-    elif args.paths:
-        runtime = Runtime()
-        for path in args.paths:
-            with open(path) as f:
-                runtime.eval_file(f)
-    elif sys.stdin.isatty():
-        Repl().loop()
-    else:
-        runtime.eval_file(sys.stdin)
+    args = parser.parse_args(argv)
+    engine = ENGINES[args.engine]
+    profiler = Profiler() if args.profile else None
+
+    try:
+        if args.server:
+            for name in ['kaa.core'] + args.preload:
+                REGISTRY.load(name)
+            forkserver.serve(args.server, run)
+        elif args.expression:
+            Runtime(engine, profiler).eval_string(args.expression)
+        elif args.paths:
+            runtime = Runtime(engine, profiler)
+            for path in args.paths:
+                with open(path) as f:
+                    runtime.eval_file(f)
+        elif sys.stdin.isatty():
+            Repl(engine, profiler).loop()
+        else:
+            Runtime(engine, profiler).eval_file(sys.stdin)
+    finally:
+        if profiler:
+            write_profile(profiler, args.profile_stacks)
+
+
+def write_profile(profiler, stacks_path=None):
+    profiler.print_stats(file=sys.stderr)
+    if stacks_path:
+        with open(stacks_path, 'w', encoding='utf-8') as f:
+            for line in profiler.collapsed_stacks():
+                print(line, file=f)
 
 
 if __name__ == '__main__':
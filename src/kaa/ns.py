@@ -1,40 +1,38 @@
 from importlib import import_module
 import os
 import sys
+from threading import RLock
 
+from kaa.cache import read_forms
 from kaa.core import Symbol
-from kaa.env import Environment
+from kaa.env import Cell
 from kaa.evaluator import Evaluator
-from kaa.reader import Reader
+from kaa.parser import Scope
+from kaa.reader import resolve_symbols
 
 
-class Namespace:
+class Namespace:  # pylint: disable=too-many-instance-attributes
+    """
+    A namespace's definitions can be read and written from multiple threads.
+    Each definition's cell is created once, so every reference sees its
+    latest value.
+    """
+
     def __init__(self, name, import_core=True):
         self.name = name
-        self.defs = Environment()
+        self.defs = {}                 # Symbol -> Cell
         self.imported_namespaces = {}  # ns name -> Namespace
         self.imported_modules = {}     # module name -> module
         self.imported_symbol_refs = {} # local name -> imported name
         self.imported_symbols = set()  # imported names
         self.ns_aliases = {}           #
+        # Scope of forms evaluated at the top level of the namespace
+        self.scope = Scope((), ns=self)
         if name != 'kaa.core' and import_core:
             self.import_ns(self.load_ns('kaa.core'), '*')
 
-    def load_ns(self, name):  # pylint: disable=no-self-use
-        if name.startswith('.'):
-            # To implement relative imports we need to track the current
-            # namespace and where it is in the filesystem.
-            raise NotImplementedError('relative imports not yet implemented')
-        filename = f'{name.replace(".", "/")}.lisp'
-        candidates = (os.path.join(dirname, filename) for dirname in sys.path)
-        try:
-            path = next(path for path in candidates if os.path.exists(path))
-        except StopIteration:
-            raise ImportError(f'"{filename}" not found for namespace {name}', name=name) from None
-        ns = Namespace(name)
-        with open(path) as f:
-            Evaluator(ns).evaluate_all(Reader(ns).read_file(f))
-        return ns
+    def load_ns(self, name, reload=False):  # pylint: disable=no-self-use
+        return REGISTRY.load(name, reload)
 
     def import_ns(self, ns, symbol_names, alias=None):
         self.imported_namespaces[ns.name] = ns
@@ -97,10 +95,9 @@ class Namespace:
             return True
 
     def __getitem__(self, sym):
-        try:
-            return self.defs[sym]
-        except KeyError:
-            pass
+        cell = self.defs.get(sym)
+        if cell is not None and cell.is_bound():
+            return cell.value
         try:
             return self.imported_namespaces[sym.ns][sym]
         except KeyError:
@@ -114,9 +111,89 @@ class Namespace:
     def __setitem__(self, sym, value):
         assert isinstance(sym, Symbol), f'{sym} is not a Symbol'
         if sym.ns is None:
-            sym = Symbol(sym.name, self.name, sym.meta)
+            sym = sym.in_ns(self.name)
         assert sym.ns == self.name, f'cannot define {sym} via namespace {self.name}'
-        self.defs[sym] = value
+        self.cell(sym).value = value
+
+    def cell(self, sym):
+        """
+        Returns the cell that holds the definition of `sym`, creating an unbound
+        one if it's not yet defined. Returns None for symbols that don't refer
+        to a namespace definition, e.g. Python module attributes.
+        """
+        if sym.ns is None or sym.ns == self.name:
+            sym = Symbol(sym.name, self.name)
+            cell = self.defs.get(sym)
+            if cell is None:
+                # Other threads may be creating the same cell; only one wins
+                cell = self.defs.setdefault(sym, Cell())
+            return cell
+        ns = self.imported_namespaces.get(sym.ns)
+        return ns.cell(sym) if ns else None
 
     def exportables(self):
-        return (sym for sym in self.defs if sym.ns == self.name)
+        # Copy the items first, as other threads may be adding definitions
+        return (sym for sym, cell in list(self.defs.items())
+                if sym.ns == self.name and cell.is_bound())
+
+
+class Registry:
+    """
+    Process-wide table of loaded namespaces, keyed by name.
+
+    Each namespace source file is evaluated once; subsequent imports (from any
+    namespace or `Runtime`) share the same `Namespace` instance.
+    """
+
+    def __init__(self):
+        self.namespaces = {}  # ns name -> Namespace
+        self.loading = []     # names of namespaces currently being evaluated
+        self.lock = RLock()
+
+    def load(self, name, reload=False):
+        # Loaded namespaces are returned without waiting for any being loaded
+        ns = self.namespaces.get(name)
+        if ns is not None and not reload:
+            return ns
+        with self.lock:
+            ns = self.namespaces.get(name)
+            if ns is not None and not reload:
+                return ns
+            if name in self.loading:
+                cycle = ' -> '.join(self.loading[self.loading.index(name):] + [name])
+                raise CyclicImport(f'cyclic import of namespace {name}: {cycle}', name=name)
+            path = find_ns_file(name)
+            self.loading.append(name)
+            try:
+                # Reloading evaluates into the existing namespace, so that
+                # importers see the new definitions.
+                ns = ns or Namespace(name)
+                forms = read_forms(path)
+                Evaluator(ns).evaluate_all(resolve_symbols(form, ns) for form in forms)
+            finally:
+                self.loading.pop()
+            self.namespaces[name] = ns
+            return ns
+
+    def __contains__(self, name):
+        return name in self.namespaces
+
+
+REGISTRY = Registry()
+
+
+def find_ns_file(name):
+    if name.startswith('.'):
+        # To implement relative imports we need to track the current
+        # namespace and where it is in the filesystem.
+        raise NotImplementedError('relative imports not yet implemented')
+    filename = f'{name.replace(".", "/")}.lisp'
+    candidates = (os.path.join(dirname, filename) for dirname in sys.path)
+    try:
+        return next(path for path in candidates if os.path.exists(path))
+    except StopIteration:
+        raise ImportError(f'"{filename}" not found for namespace {name}', name=name) from None
+
+
+class CyclicImport(ImportError):
+    pass
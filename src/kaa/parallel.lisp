@@ -0,0 +1,7 @@
+;; kaa.parallel
+;; Parallel map and reduce, over a pool of worker processes
+
+(import py/kaa.parallel as impl)
+
+(def pmap impl/pmap)
+(def preduce impl/preduce)
@@ -0,0 +1,201 @@
+"""
+Parallel map and reduce for the `kaa.parallel` namespace, over a pool of
+worker processes, so CPU-bound kaa code can use more than one core.
+
+Lambdas can't be pickled as they are, so they're sent to workers as the form
+they were parsed from, plus their namespace and the values they capture, and
+parsed again in each worker. Namespaces loaded from files are sent by name
+and loaded by each worker. Others, such as a `Runtime`'s `main`, are sent as
+their imports plus the definitions the lambdas refer to, directly or through
+other definitions, so unrelated definitions needn't be picklable.
+
+Args and results are pickled as usual, so they can't be lambdas.
+"""
+from concurrent.futures import ProcessPoolExecutor
+from functools import reduce
+import io
+import os
+import pickle
+
+from kaa.compiler import Compiler, Function
+from kaa.core import List
+from kaa.env import Cell
+from kaa.evaluator import Closure, Evaluator
+from kaa.ns import Namespace, REGISTRY
+from kaa.parser import all_symbols, Macro, parse, Scope
+
+
+def pmap(f, seq, workers=None):
+    "Returns a list of `(f x)` for each `x` in `seq`, computed by `workers` processes."
+    items = list(seq)
+    workers = workers or os.cpu_count()
+    chunksize = max(1, len(items) // (workers * 4))
+    with _pool(f, workers) as pool:
+        return List(pool.map(_call, items, chunksize=chunksize))
+
+
+def preduce(f, *args, workers=None):
+    """
+    (preduce f seq) or (preduce f initial seq)
+
+    Like `reduce`, but reduces chunks of `seq` in parallel, then reduces
+    their results, so `f` must be associative.
+    """
+    *initial, seq = args
+    items = list(seq)
+    # Each chunk needs at least two items to be worth sending
+    workers = min(workers or os.cpu_count(), len(items) // 2)
+    if workers < 2:
+        return reduce(f, items, *initial)
+    size = -(-len(items) // workers)
+    chunks = [items[i:i + size] for i in range(0, len(items), size)]
+    with _pool(f, workers) as pool:
+        results = list(pool.map(_reduce, chunks))
+    return reduce(f, results, *initial)
+
+
+def _pool(f, workers):
+    return ProcessPoolExecutor(workers, initializer=_init_worker, initargs=(dumps(f),))
+
+
+# Function applied by this worker process
+_WORKER_FN = None
+
+
+def _init_worker(payload):
+    global _WORKER_FN  # pylint: disable=global-statement
+    _WORKER_FN = pickle.loads(payload)
+
+
+def _call(item):
+    return _WORKER_FN(item)
+
+
+def _reduce(items):
+    return reduce(_WORKER_FN, items)
+
+
+def dumps(obj):
+    "Pickles `obj`, which may be or contain kaa lambdas, macros and namespaces."
+    f = io.BytesIO()
+    _Pickler(f, pickle.HIGHEST_PROTOCOL, _referenced_defs(obj)).dump(obj)
+    return f.getvalue()
+
+
+class _Pickler(pickle.Pickler):
+    def __init__(self, file, protocol, referenced_defs):
+        super().__init__(file, protocol)
+        # id(Namespace) -> symbols of its definitions to pickle, or None for all.
+        # Namespaces that aren't included have no definitions pickled.
+        self.referenced_defs = referenced_defs
+
+    def reducer_override(self, obj):  # pylint: disable=too-many-return-statements
+        if isinstance(obj, Closure):
+            return _check_form(_load_lambda, obj.form,
+                               (Evaluator, obj.ns, obj.lexical_env, _definition(obj)))
+        if isinstance(obj, Function):
+            return _check_form(_load_lambda, obj.node.form,
+                               (Compiler, obj.ns, obj.captured, _definition(obj.node)))
+        if isinstance(obj, Macro):
+            return _check_form(_load_macro, obj.form, (obj.form,))
+        if isinstance(obj, Namespace):
+            if REGISTRY.namespaces.get(obj.name) is obj:
+                return _load_namespace, (obj.name,)
+            # Definitions may refer back to the namespace, so they're pickled
+            # as state, after the namespace itself
+            state = _namespace_state(obj, self.referenced_defs.get(id(obj), ()))
+            return Namespace, (obj.name, False), state, None, None, _set_namespace_state
+        if isinstance(obj, List) and 'node' in obj.meta:
+            # Leave out parsed nodes cached on the form
+            return List, (tuple(obj), {k: v for k, v in obj.meta.items() if k != 'node'})
+        return NotImplemented
+
+
+def _check_form(load, form, args):
+    if form is None:
+        raise pickle.PicklingError("can't pickle a lambda or macro without its form")
+    return load, args
+
+
+def _definition(node):
+    return node.form, node.free, node.name, node.source
+
+
+def _load_lambda(engine, ns, captured, definition):
+    form, free, name, source = definition
+    node = parse(form, Scope(free, ns=ns) if free else ns.scope)
+    node = node._replace(name=name, source=source)
+    # Parsed within a scope of just the captured locals, they're the frame
+    return engine(ns, list(captured)).evaluate(node)
+
+
+def _load_namespace(name):
+    return REGISTRY.load(name)
+
+
+def _load_macro(form):
+    return parse(form).value
+
+
+def _referenced_defs(obj):
+    """
+    Finds the definitions of unregistered namespaces that lambdas and macros
+    in `obj` refer to, directly or through other definitions. Returns a dict
+    of id(Namespace) -> symbols, or None for namespaces pickled in full.
+    """
+    referenced = {}
+    pending = [(obj, None)]  # (value, namespace it was defined in)
+    seen = set()
+    while pending:
+        obj, ns = pending.pop()
+        if id(obj) in seen:
+            continue
+        seen.add(id(obj))
+        if isinstance(obj, Namespace):
+            referenced[id(obj)] = None
+            continue
+        if isinstance(obj, (Closure, Function)):
+            ns = obj.ns
+            form, captured = (obj.form, obj.lexical_env) if isinstance(obj, Closure) \
+                else (obj.node.form, obj.captured)
+            pending.extend((value, ns) for value in captured)
+        elif isinstance(obj, Macro) and ns:
+            form = obj.form
+        elif isinstance(obj, (List, list, tuple)):
+            pending.extend((value, ns) for value in obj)
+            continue
+        else:
+            continue
+        # Quoted symbols are included, as macros may expand them into references
+        for sym in all_symbols(form):
+            owner = ns if sym.ns == ns.name else ns.imported_namespaces.get(sym.ns)
+            if owner is None or REGISTRY.namespaces.get(owner.name) is owner:
+                continue
+            syms = referenced.setdefault(id(owner), set())
+            cell = owner.defs.get(sym)
+            if syms is not None and cell is not None and cell.is_bound():
+                syms.add(sym)
+                pending.append((cell.value, owner))
+    return referenced
+
+
+def _namespace_state(ns, syms=None):
+    "`syms` are the definitions to include, or None for all of them."
+    return {
+        'defs': {sym: cell.value for sym, cell in ns.defs.items()
+                 if cell.is_bound() and (syms is None or sym in syms)},
+        'imported_namespaces': ns.imported_namespaces,
+        'imported_modules': tuple(ns.imported_modules),
+        'imported_symbol_refs': ns.imported_symbol_refs,
+        'imported_symbols': ns.imported_symbols,
+        'ns_aliases': ns.ns_aliases,
+    }
+
+
+def _set_namespace_state(ns, state):
+    ns.defs = {sym: Cell(value) for sym, value in state['defs'].items()}
+    ns.imported_namespaces = state['imported_namespaces']
+    ns.imported_modules = {name: ns.load_module(name) for name in state['imported_modules']}
+    ns.imported_symbol_refs = state['imported_symbol_refs']
+    ns.imported_symbols = state['imported_symbols']
+    ns.ns_aliases = state['ns_aliases']
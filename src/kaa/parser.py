@@ -4,30 +4,131 @@ from itertools import dropwhile, islice, takewhile
 from kaa.core import is_list, is_symbol, Symbol
 
 
-def parse(expr):
-    if is_list(expr) and expr and is_symbol(expr[0]):
-        try:
-            f = SPECIAL_FORMS[expr[0]]
-        except KeyError:
-            pass
-        else:
-            expr = f(expr)
-    return expr
-
-
-Def = namedtuple('Def', 'symbol value')
-If = namedtuple('If', 'cond then else_')
-Import = namedtuple('Import', 'source names alias')
-Lambda = namedtuple('Lambda', 'params body ns lexical_env')
-Macro = namedtuple('Macro', 'params body')
+def parse(expr, scope=None, source=None):
+    """
+    Convert a form into a tree of nodes. Non-empty lists become special form
+    nodes or `Call`s; the result is cached on the list so each form is only
+    parsed once, however many times it is evaluated.
+
+    `scope` is the frame layout of the enclosing lambda, or the root scope of
+    the namespace the form is evaluated in. Symbols bound in it are addressed
+    by slot index; others become `Global`s. `source` is where a symbol was
+    read, if known.
+    """
+    if is_symbol(expr):
+        return parse_symbol(expr, scope, source)
+    if not (is_list(expr) and expr):
+        return expr
+    # The same form might be parsed in different scopes, e.g. if a macro
+    # includes one of its args in its expansion more than once.
+    cached = expr.meta.get('node')
+    if cached and cached[0] is scope:
+        return cached[1]
+    f = SPECIAL_FORMS.get(expr[0]) if is_symbol(expr[0]) else None
+    if f:
+        node = f(expr, scope)
+        source = expr.meta.get('source')
+        if source and node.source is None:
+            node = node._replace(source=source)
+    else:
+        node = Call(expr, scope)
+    expr.meta['node'] = (scope, node)
+    return node
+
+
+def parse_all(forms, scope=None, sources=None):
+    if not sources:
+        return tuple(parse(form, scope) for form in forms)
+    return tuple(parse(form, scope, source) for form, source in zip(forms, sources))
+
+
+def parse_symbol(sym, scope, source=None):
+    if sym.ns == 'py':
+        return sym
+    index = scope.address(sym) if scope else None
+    if index is None:
+        return Global(sym, source)
+    return Local(sym, index)
+
+
+# Special form nodes have the `source` location of their form, if known. For
+# lambdas and macros, it's the location of their definition, and `name` is the
+# symbol they're defined as, if any. They also keep the `form` they were parsed
+# from, and lambdas the `free` symbols they capture, so they can be parsed
+# again in another process (see `kaa.parallel`).
+Await = namedtuple('Await', 'expr source', defaults=(None,))
+Def = namedtuple('Def', 'symbol value source', defaults=(None,))
+If = namedtuple('If', 'cond then else_ source', defaults=(None,))
+Import = namedtuple('Import', 'target names alias source', defaults=(None,))
+Lambda = namedtuple('Lambda', 'params body ns lexical_env captures name source form free',
+                    defaults=(None, ()))
+Local = namedtuple('Local', 'symbol index')
+Macro = namedtuple('Macro', 'params body name source form', defaults=(None,))
 Params = namedtuple('Params', 'required optional rest')
-Quote = namedtuple('Quote', 'value')
-Raise = namedtuple('Raise', 'ex')
-Try = namedtuple('Try', 'expr handlers')
+Quote = namedtuple('Quote', 'value source', defaults=(None,))
+Raise = namedtuple('Raise', 'ex source', defaults=(None,))
+Try = namedtuple('Try', 'expr handlers source', defaults=(None,))
+
+
+class Call:
+    """
+    Invocation of a function or macro. The callee isn't known until runtime, and
+    macro args must be left unparsed, so args are only parsed on first use.
+    """
+
+    def __init__(self, form, scope=None):
+        self.form = form
+        self.scope = scope
+        self.sources = form.meta.get('sources')
+        self.fn = parse(form[0], scope, self.sources[0] if self.sources else None)
+        self._args = None
+        # (macro, parsed expansion) for the last macro this call site expanded
+        self.expansion = None
+
+    @property
+    def args(self):
+        if self._args is None:
+            self._args = parse_all(self.form[1:], self.scope, self.sources and self.sources[1:])
+        return self._args
+
+
+class Global:
+    """
+    Reference to a namespace-level definition. The namespace cell holding its
+    value is looked up on first evaluation and cached.
+    """
+
+    def __init__(self, symbol, source=None):
+        self.symbol = symbol
+        self.source = source
+        self.resolved = None  # (Namespace, cell or None)
+
+
+class Scope:
+    """
+    Compile-time layout of a lambda's frame: its params, followed by the free
+    variables it captures from the enclosing scope. `ns` is the namespace the
+    lambda is evaluated in, if known. A namespace's root scope has no params.
+    """
+
+    def __init__(self, params, free=(), ns=None):
+        # Later params shadow earlier ones of the same name, as in `bind_params`
+        self.indexes = {sym: i for i, sym in enumerate(params + free)}
+        self.ns = ns
+
+    def address(self, sym):
+        "Returns the index of the frame slot bound to `sym`, or None if it's not local."
+        return self.indexes.get(sym)
+
+
+# (await EXPR)
+def parse_await(form, scope=None):
+    check(len(form) == 2, '`await` requires 1 arg', form)
+    return Await(parse(form[1], scope, _item_source(form, 1)))
 
 
 # (def NAME EXPR)
-def parse_def(form):
+def parse_def(form, scope=None):
     check(len(form) == 3, '`def` requires 2 args', form)
     _, sym, val = form
     check(is_symbol(sym), '`def` name must be a symbol', form)
@@ -39,59 +140,164 @@ def parse_def(form):
     # FIXME: this leads to confusing behaviour if a namespaced symbol is passed
     # to the reader. We should throw an error we read a qualified symbol that
     # resolves to another namespace, not silently rewrite it.
-    sym = Symbol(sym.name, None, sym.meta)
+    sym = Symbol(sym.name)
+    val = parse(val, scope, _item_source(form, 2))
+    if isinstance(val, Lambda) and val.name is None:
+        val = val._replace(name=sym, source=val.source or form.meta.get('source'))
     return Def(sym, val)
 
 
 # (defmacro NAME PARAMS [EXPR …])
-def parse_defmacro(form):
+def parse_defmacro(form, scope=None):
     check(len(form) >= 3, '`defmacro` requires 2+ args', form)
     _, name, params, *body = form
-    check(is_symbol(name), 'macro name must be a symbol', name)
-    return Def(name, Macro(parse_params(params), body))
+    check(is_symbol(name), 'macro name must be a symbol', name, _item_location(form, 1))
+    # Macro bodies only see their own params, not any enclosing lambda's
+    params = parse_params(params, _item_location(form, 2))
+    body = parse_all(body, Scope(param_names(params), ns=scope and scope.ns),
+                     _item_sources(form, 3))
+    return Def(name, Macro(params, body, name, form.meta.get('source'), form))
 
 
 # (if COND THEN [ELSE])
-def parse_if(form):
+def parse_if(form, scope=None):
     check(len(form) in (3, 4), '`if` requires 2 or 3 args', form)
-    return If(form[1], form[2], form[3] if len(form) == 4 else None)
+    return If(parse(form[1], scope, _item_source(form, 1)),
+              parse(form[2], scope, _item_source(form, 2)),
+              parse(form[3], scope, _item_source(form, 3)) if len(form) == 4 else None)
 
 
 # (import [(NAME …) from] NAMESPACE [as ALIAS])
-def parse_import(form):
+def parse_import(form, scope=None):  # pylint: disable=unused-argument
     check(len(form) >= 2, '`import` requires 1+ args', form)
+    location = form.meta.get('source')
     form = form[1:]
     if is_list(form[0]):
-        symbols = form.pop(0)
-        check(all(is_symbol(x) for x in symbols), 'imported names must be symbols', symbols)
-        form.pop(0)
+        symbols = form[0]
+        check(all(is_symbol(x) for x in symbols), 'imported names must be symbols', symbols,
+              location)
+        form = form[2:]
     else:
         symbols = None
-    source = form.pop(0)
-    check(is_symbol(source), 'import source must be a symbol', source)
+    source, form = form[0], form[1:]
+    check(is_symbol(source), 'import source must be a symbol', source, location)
     alias = form[1] if form else None
     if alias:
-        check(is_symbol(alias), 'import alias must be a symbol', alias)
+        check(is_symbol(alias), 'import alias must be a symbol', alias, location)
     return Import(source, symbols, alias)
 
 
 # (lambda PARAMS [EXPR …])
-def parse_lambda(form):
+def parse_lambda(form, scope=None):
     check(len(form) >= 2, '`lambda` requires 1+ args', form)
     _, params, *body = form
-    return Lambda(params=parse_params(params), body=body, ns=None, lexical_env=None)
+    params = parse_params(params, _item_location(form, 1))
+    names = param_names(params)
+    # Capture only enclosing locals that the body might refer to
+    if not scope:
+        free = ()
+    else:
+        symbols = _referenced_symbols(body, names, scope)
+        free = tuple(sym for sym in (scope.indexes if symbols is None else symbols)
+                     if sym not in names and scope.address(sym) is not None)
+    body = parse_all(body, Scope(names, free, scope and scope.ns), _item_sources(form, 2))
+    captures = tuple(scope.address(sym) for sym in free)
+    return Lambda(params=params, body=body, ns=None, lexical_env=None, captures=captures,
+                  name=None, source=form.meta.get('source'), form=form, free=free)
+
+
+def _referenced_symbols(forms, names, scope):
+    """
+    Returns the symbols that some forms in `scope` might refer to, in order of
+    appearance, or None if they might refer to any.
+
+    Macro calls aren't expanded until runtime. For those bound to a macro when
+    parsed, the symbols in the call and in the definitions of the macros it
+    may expand to are included. Any other call to a global might be to a macro
+    that isn't defined yet, whose expansion can't be known. `names` are locals
+    that can't be macros.
+    """
+    symbols = {}
+    return symbols if _add_symbols(forms, names, scope, symbols, set()) else None
+
+
+def _add_symbols(forms, names, scope, symbols, seen):
+    for form in forms:
+        if is_symbol(form):
+            symbols[form] = None
+            continue
+        if not (is_list(form) and form) or form[0] == Symbol('quote'):
+            continue
+        f = form[0]
+        if is_symbol(f) and f not in SPECIAL_FORMS and f.ns != 'py' and f not in names \
+                and scope.address(f) is None:
+            macro = _bound_macro(f, scope.ns)
+            if macro is _UNKNOWN:
+                return False
+            if macro is not None:
+                _add_expansion_symbols(form, scope.ns, symbols, seen)
+                continue
+        inner_names = names
+        if f == Symbol('lambda') and len(form) >= 2 and is_list(form[1]):
+            # Its params can't be macros either
+            inner_names = names + tuple(form[1])
+        if not _add_symbols(form, inner_names, scope, symbols, seen):
+            return False
+    return True
+
+
+def _add_expansion_symbols(form, ns, symbols, seen):
+    """
+    Adds the symbols in a macro call `form`, quoted or not, and those in the
+    definitions of macros they're bound to, which its expansion may include.
+    Macro ids are added to `seen` so each definition is only visited once.
+    """
+    for sym in all_symbols(form):
+        symbols[sym] = None
+        macro = _bound_macro(sym, ns)
+        if isinstance(macro, Macro) and id(macro) not in seen:
+            seen.add(id(macro))
+            _add_expansion_symbols(macro.form, ns, symbols, seen)
+
+
+def _bound_macro(sym, ns):
+    "The macro `sym` is bound to in `ns`, None if it's bound to something else, else _UNKNOWN."
+    if ns is None:
+        return _UNKNOWN
+    try:
+        value = ns[sym]
+    except KeyError:
+        return _UNKNOWN
+    return value if isinstance(value, Macro) else None
+
+
+def all_symbols(form):
+    "Yields all symbols in `form`, including quoted ones."
+    if is_symbol(form):
+        yield form
+    elif is_list(form):
+        for x in form:
+            yield from all_symbols(x)
+
+
+_UNKNOWN = object()
 
 
 # ([SYM …] [&optional SYM …] [&rest SYM])
-def parse_params(form):
+def parse_params(form, source=None):
     check(is_list(form) and all(is_symbol(p) for p in form),
-          'params must be a list of symbols', form)
+          'params must be a list of symbols', form, source)
     required = _parse_required_params(form)
     optional = _parse_optional_params(form)
     rest = _parse_rest_param(form)
     return Params(required, optional, rest)
 
 
+def param_names(params):
+    "Param symbols in the order `bind_params` binds them to frame slots."
+    return params.required + params.optional + ((params.rest,) if params.rest else ())
+
+
 def _parse_required_params(form):
     return tuple(takewhile(lambda s: s.name not in ('&optional', '&rest'), form))
 
@@ -111,35 +317,39 @@ def _parse_rest_param(form):
 
 
 # (raise EXPR)
-def parse_raise(form):
+def parse_raise(form, scope=None):
     check(len(form) == 2, '`raise` requires 1 arg', form)
-    return Raise(form[1])
+    return Raise(parse(form[1], scope, _item_source(form, 1)))
 
 
 # (quote EXPR)
-def parse_quote(form):
+def parse_quote(form, scope=None):  # pylint: disable=unused-argument
     check(len(form) == 2, '`quote` requires 1 arg', form)
     return Quote(form[1])
 
 
 # (try EXPR (catch EX EXPR) …)
-def parse_try(form):
+def parse_try(form, scope=None):
     check(len(form) >= 3, '`try` requires 2+ args', form)
     _, expr, *excepts = form
-    return Try(expr, (_parse_except(except_) for except_ in excepts))
+    return Try(parse(expr, scope, _item_source(form, 1)),
+               tuple(_parse_except(except_, scope, _item_location(form, i))
+                     for i, except_ in enumerate(excepts, 2)))
 
 
-def _parse_except(form):
+def _parse_except(form, scope, source):
     check(is_list(form) and len(form) == 3 and form[0] == Symbol('except'),
-          'invalid except form', form)
-    return form[1:3]
+          'invalid except form', form, source)
+    return (parse(form[1], scope, _item_source(form, 1)),
+            parse(form[2], scope, _item_source(form, 2)))
 
 
-def raise_invalid_top_level_except(form):
+def raise_invalid_top_level_except(form, scope=None):  # pylint: disable=unused-argument
     check(False, '`except` must appear within `try`', form)
 
 
 SPECIAL_FORMS = {
+    Symbol('await'): parse_await,
     Symbol('def'): parse_def,
     Symbol('defmacro'): parse_defmacro,
     # Not invoked directly as a special form, but here so reader recognizes it
@@ -154,14 +364,33 @@ SPECIAL_FORMS = {
 }
 
 
-def check(cond, msg, form):
+def _item_source(form, i):
+    "Where the symbol at index `i` of list `form` was read, if known."
+    sources = form.meta.get('sources')
+    return sources[i] if sources and i < len(sources) else None
+
+
+def _item_sources(form, start):
+    "Where the symbols from index `start` of list `form` on were read, if known."
+    sources = form.meta.get('sources')
+    return sources[start:] if sources else None
+
+
+def _item_location(form, i):
+    "Where item `i` of list `form` was read if it's a symbol, else where `form` was read."
+    return _item_source(form, i) or form.meta.get('source')
+
+
+def check(cond, msg, form, source=None):
+    """
+    Raises a `ParseError` unless `cond`, located where `form` was read if it's
+    a list, else at `source`, if known.
+    """
     if cond:
         return
-    try:
-        source = ' at %s' % form.meta['source']
-    except KeyError:
-        source = ''
-    raise ParseError(msg + source)
+    if is_list(form) and form.meta.get('source'):
+        source = form.meta['source']
+    raise ParseError(msg + (' at %s' % source if source else ''))
 
 
 class ParseError(Exception):
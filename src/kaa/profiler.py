@@ -0,0 +1,122 @@
+"""
+Profiler for kaa code. While a `Profiler` is enabled, it's notified of each
+lambda call and macro expansion via `kaa.hooks`:
+
+    with Profiler() as profiler:
+        runtime.eval_file(f)
+    profiler.print_stats()
+
+Tail calls replace the caller's frame, as they do on the stack, so time spent
+in a tail-called lambda isn't included in its caller's cumulative time.
+"""
+import sys
+import time
+
+from kaa import hooks
+from kaa.parser import Macro
+
+
+class Profiler(hooks.Hook):
+    events = ('call', 'macro')
+
+    def __init__(self, clock=time.perf_counter):
+        self.clock = clock
+        self.stats = {}          # (name, source) -> Stats
+        self.root = CallNode()   # Tree of call paths, for collapsed stacks
+        self.frames = []         # [Stats, CallNode, start time, time in callees]
+
+    def __enter__(self):
+        self.enable()
+        return self
+
+    def __exit__(self, *exc_info):
+        self.disable()
+
+    def enable(self):
+        hooks.register(self)
+
+    def disable(self):
+        hooks.unregister(self)
+
+    def enter(self, event, target, source):
+        "Records entry to a lambda or macro."
+        # Identify the lambda or macro by its definition, not the call site
+        key = (target.name, target.source)
+        stats = self.stats.get(key)
+        if stats is None:
+            stats = self.stats[key] = Stats(describe(target))
+        parent = self.frames[-1][1] if self.frames else self.root
+        node = parent.children.get(key)
+        if node is None:
+            node = parent.children[key] = CallNode(stats.label)
+        stats.depth += 1
+        self.frames.append([stats, node, self.clock(), 0.0])
+
+    def exit(self, event, target, source):
+        "Records exit from the most recently entered lambda or macro."
+        stats, node, start, callees = self.frames.pop()
+        elapsed = self.clock() - start
+        stats.calls += 1
+        stats.self_time += elapsed - callees
+        node.self_time += elapsed - callees
+        stats.depth -= 1
+        # Count recursive calls' time once, in the outermost call
+        if not stats.depth:
+            stats.cumulative_time += elapsed
+        if self.frames:
+            self.frames[-1][3] += elapsed
+
+    def sorted_stats(self, sort='cumulative'):
+        return sorted(self.stats.values(), key=SORT_KEYS[sort], reverse=True)
+
+    def print_stats(self, sort='cumulative', file=None):
+        "Prints a table of call counts and times, most expensive first."
+        file = file or sys.stdout
+        print(f'{"calls":>9} {"self (s)":>10} {"cumul (s)":>10}  function', file=file)
+        for stats in self.sorted_stats(sort):
+            print(f'{stats.calls:9} {stats.self_time:10.4f} {stats.cumulative_time:10.4f}  '
+                  f'{stats.label}', file=file)
+
+    def collapsed_stacks(self):
+        """
+        Yields lines of `label;label;… microseconds` giving the self time of
+        each call path, as taken by flame graph tools.
+        """
+        nodes = [(node.label, node) for node in self.root.children.values()]
+        while nodes:
+            path, node = nodes.pop()
+            micros = round(node.self_time * 1e6)
+            if micros:
+                yield f'{path} {micros}'
+            nodes.extend((f'{path};{child.label}', child) for child in node.children.values())
+
+
+class Stats:
+    def __init__(self, label):
+        self.label = label
+        self.calls = 0
+        self.self_time = 0.0
+        self.cumulative_time = 0.0
+        self.depth = 0  # number of calls currently on the stack
+
+
+class CallNode:
+    def __init__(self, label=None):
+        self.label = label
+        self.children = {}  # (name, source) -> CallNode
+        self.self_time = 0.0
+
+
+SORT_KEYS = {
+    'calls': lambda stats: stats.calls,
+    'self': lambda stats: stats.self_time,
+    'cumulative': lambda stats: stats.cumulative_time,
+}
+
+
+def describe(fn):
+    "Label for a lambda or macro: its defined name, if any, and its source location."
+    name = fn.name.name if fn.name else '<lambda>'
+    if isinstance(fn, Macro):
+        name = f'{name} [macro]'
+    return f'{name} ({fn.source})' if fn.source else name
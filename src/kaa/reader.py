@@ -1,12 +1,29 @@
 import re
 
-from kaa.core import first, is_list, rest, List, Symbol
+from kaa.core import first, is_list, is_symbol, rest, List, Symbol
 from kaa.parser import SPECIAL_FORMS
-from kaa.stream import CharStream, IterStream, StreamEmpty
+from kaa.stream import CharStream
 
 
 EOLIST = object()
-ATOM = re.compile(r'[^\s\(\)]+')
+# Skips whitespace and comments, then matches a single token. No token group
+# matches at the end of input, or at the start of an unterminated string.
+TOKEN = re.compile(r"""
+    (?:\s+|;[^\n]*)*
+    (?:
+        (?P<open>\()
+      | (?P<close>\))
+      | (?P<quote>')
+      | (?P<quasiquote>`)
+      | (?P<unquote>~@?)
+      | (?P<string>"(?:[^"\\]|\\.)*")
+      | (?P<atom>[^\s()"';`~][^\s()]*)
+    )?
+""", re.VERBOSE | re.DOTALL)
+# Tokens that might continue past the end of the buffered input
+EXTENSIBLE_TOKENS = {'unquote', 'atom'}
+# Special form names aren't resolved in a namespace
+SPECIAL_FORM_SYMBOLS = {sym.name: sym for sym in SPECIAL_FORMS}
 INTEGER = re.compile(r'[+-]?[0-9]+')
 LITERALS = {
     'True': True,
@@ -16,113 +33,146 @@ LITERALS = {
 
 
 class Reader:
+    """
+    Reads forms from text. Symbols are resolved against `ns` as they're read,
+    or left as written if `ns` is None (see `resolve_symbols`).
+    """
+
     def __init__(self, ns):
         self.ns = ns
         self.list_depth = 0
 
     def read_file(self, f):
-        return self.read_all(IterStream(f, f.name))
+        "Reads forms from a file, which is read into memory in one go."
+        return self.read_all(CharStream(f.read(), f.name))
 
     def read_string(self, s):
         return self.read_all(CharStream(s))
 
     def read_all(self, stream):
+        for obj, _ in self.read_all_with_sources(stream):
+            yield obj
+
+    def read_all_with_sources(self, stream):
+        "Like `read_all`, but yields each form with where it was read."
         while True:
-            obj = self.read_next(stream)
+            token = _next_token(stream)
+            obj = self._read_token(token, stream)
             if obj is None:
                 break
-            yield obj
+            yield obj, stream.source_meta(token.start(token.lastgroup))
 
-    def read_next(self, stream):  # pylint: disable=too-many-return-statements
+    def read_next(self, stream):
         "Reads next form from given char buffer."
-        while (stream.peek_char() or '').isspace():
-            stream.pop_char()
-
-        try:
-            c = stream.pop_char()
-        except StreamEmpty:
+        return self._read_token(_next_token(stream), stream)
+
+    def is_incomplete(self, stream):
+        "Whether the input read from `stream` so far ends part way through a form."
+        if self.list_depth > 0:
+            return True
+        # An unterminated string
+        token = TOKEN.match(stream.source, stream.col)
+        return token.lastgroup is None and token.end() < len(stream.source)
+
+    def _read_token(self, token, stream):  # pylint: disable=too-many-return-statements
+        "Reads the form starting with `token`."
+        if token is None:
             if self.list_depth > 0:
                 raise EOF()  # TODO: should this return UnbalancedDelimiter?
             return None
 
-        if c == ';':
-            while c != '\n':
-                c = stream.pop_char()
-            return self.read_next(stream)
-        if c == "'":
-            return self._read_quote(stream)
-        if c == '`':
+        kind = token.lastgroup
+        pos = token.start(kind)
+        if kind == 'quote':
+            return self._read_quote(stream, pos)
+        if kind == 'quasiquote':
             return self._read_quasiquote(stream)
-        if c == '~':
-            return self._read_unquote(stream)
-        if c == '(':
-            return self._read_list(stream)
-        if c == ')':
+        if kind == 'unquote':
+            return self._read_unquote(token.group(kind), stream, pos)
+        if kind == 'open':
+            return self._read_list(stream, pos)
+        if kind == 'close':
             if self.list_depth == 0:
                 raise UnbalancedDelimiter(
-                    'unbalanced delimiter %s at %s' % (c, stream.source_meta()))
+                    'unbalanced delimiter ) at %s' % stream.source_meta(pos))
             return EOLIST
-        if c == '"':
-            return _read_string(stream)
-        return self._read_atom(c, stream)
+        if kind == 'string':
+            return read_str(token.group(kind)[1:-1])
+        return self._read_atom(token.group(kind))
 
-    def _read_quote(self, stream):
-        return List([Symbol('quote', meta={'source': stream.source_meta()}),
-                     self.read_next(stream)])
+    def _read_quote(self, stream, pos):
+        return List([Symbol('quote'), self.read_next(stream)],
+                    {'source': stream.source_meta(pos)})
 
     def _read_quasiquote(self, stream):
         return _process_quasiquote(self.read_next(stream))
 
-    def _read_unquote(self, stream):
-        if stream.peek_char() == '@':
-            stream.pop_char()
-            return List([Symbol('unquote-splice', meta={'source': stream.source_meta()}),
-                         self.read_next(stream)])
-
-        return List([Symbol('unquote', meta={'source': stream.source_meta()}),
-                     self.read_next(stream)])
+    def _read_unquote(self, token, stream, pos):
+        name = 'unquote-splice' if token == '~@' else 'unquote'
+        return List([Symbol(name), self.read_next(stream)],
+                    {'source': stream.source_meta(pos)})
 
-    def _read_list(self, stream):
-        l = List(meta={'source': stream.source_meta()})
+    def _read_list(self, stream, pos):
+        source = stream.source_meta(pos)
+        items = []
+        sources = []  # Locations of symbol items, or None for other items
         self.list_depth += 1
         while True:
-            form = self.read_next(stream)
-            if form == EOLIST:
+            token = _next_token(stream)
+            form = self._read_token(token, stream)
+            if form is EOLIST:
                 break
-            l.append(form)
+            items.append(form)
+            sources.append(stream.source_meta(token.start('atom')) if is_symbol(form) else None)
         self.list_depth -= 1
-        return l
+        return List(items, {'source': source, 'sources': tuple(sources)})
 
-    def _read_atom(self, first_char, stream):
-        meta = {'source': stream.source_meta()}
-        token = first_char
-        while ATOM.match(stream.peek_char() or ''):
-            token += stream.pop_char()
-
-        if INTEGER.match(token):
+    def _read_atom(self, token):
+        if INTEGER.fullmatch(token):
             return int(token)
 
         if token in LITERALS:
             return LITERALS[token]
 
-        return self._read_symbol(token, meta)
+        return self._read_symbol(token)
 
-    def _read_symbol(self, s, meta):
-        if any(special_form.name == s for special_form in SPECIAL_FORMS):
-            return Symbol(s, None, meta)
+    def _read_symbol(self, s):
+        special_form = SPECIAL_FORM_SYMBOLS.get(s)
+        if special_form is not None:
+            return special_form
 
         if '/' in s and s != '/':
             ns_name, sym_name = s.split('/', 1)
         else:
             ns_name, sym_name = None, s
-        return self.ns.resolve(Symbol(sym_name, ns_name, meta))
+        sym = Symbol(sym_name, ns_name)
+        return self.ns.resolve(sym) if self.ns else sym
 
 
-def _read_string(stream):
-    try:
-        return read_str(stream)
-    except StreamEmpty as ex:
-        raise EOF(ex)
+def resolve_symbols(form, ns):
+    "Resolves the symbols in a form read without a namespace, as `Reader(ns)` would."
+    if is_symbol(form):
+        return form if form in SPECIAL_FORMS else ns.resolve(form)
+    if is_list(form):
+        return List((resolve_symbols(x, ns) for x in form), form.meta)
+    return form
+
+
+def _next_token(stream):
+    "Returns a match for the next token, or None at end of input."
+    while True:
+        token = TOKEN.match(stream.source, stream.col)
+        kind = token.lastgroup
+        if kind is None or token.end() == len(stream.source) and kind in EXTENSIBLE_TOKENS:
+            # Retry with more input, as the token may be incomplete
+            if stream.more():
+                continue
+            if kind is None:
+                if token.end() < len(stream.source):
+                    raise EOF('unterminated string at %s' % stream.source_meta(token.end()))
+                return None
+        stream.col = token.end()
+        return token
 
 
 STRING_ESCAPE_SEQUENCES = {
@@ -131,22 +181,19 @@ STRING_ESCAPE_SEQUENCES = {
     '\\n': '\n',
     '\\t': '\t',
 }
+STRING_ESCAPE = re.compile(r'\\.', re.DOTALL)
 
 
-def read_str(stream):
-    s = []
-    while True:
-        c = stream.pop_char()
-        if c == '"':
-            return ''.join(s)
-        if c == '\\':
-            escape_sequence = c + stream.pop_char()
-            try:
-                s.append(STRING_ESCAPE_SEQUENCES[escape_sequence])
-            except KeyError:
-                raise InvalidEscapeSequence(escape_sequence)
-        else:
-            s.append(c)
+def read_str(s):
+    "Returns the value of a string literal, given the text between its quotes."
+    return STRING_ESCAPE.sub(_unescape, s) if '\\' in s else s
+
+
+def _unescape(match):
+    try:
+        return STRING_ESCAPE_SEQUENCES[match.group()]
+    except KeyError:
+        raise InvalidEscapeSequence(match.group()) from None
 
 
 class InvalidEscapeSequence(Exception):
@@ -3,9 +3,9 @@ import traceback
 
 from kaa.core import is_list, serialize, Symbol
 from kaa.evaluator import Evaluator
-from kaa.ns import Namespace
-from kaa.reader import Reader, EOF
-from kaa.stream import CharStream
+from kaa.reader import Reader
+from kaa.runtime import Runtime
+from kaa.stream import IterStream
 
 
 PROMPT_1 = '=> '
@@ -15,8 +15,9 @@ LAST_RESULT = '^'
 
 
 class Repl:
-    def __init__(self):
-        self.ns = Namespace('repl')
+    def __init__(self, engine=Evaluator, profiler=None):
+        self.runtime = Runtime(engine, profiler, 'repl')
+        self.ns = self.runtime.ns
         self.last_result_symbol = self.ns.resolve(Symbol('^'))
 
     def loop(self):
@@ -28,7 +29,7 @@ class Repl:
                    exprs[0][0] == Symbol('debug', '__kaa__'):
                     exprs = exprs[0][1:]
                     pdb.set_trace()
-                result = Evaluator(self.ns).evaluate_all(exprs)
+                result = self.runtime.eval_all(exprs)
             except KeyboardInterrupt:
                 # Ctrl-C; user wants to abandon current input
                 print()
@@ -47,12 +48,17 @@ class Repl:
     # TODO: proper readline support, etc.
     # TODO: tab completion
     def read_exprs(self):
-        s = input(PROMPT_1)
-        while True:
-            line = CharStream(s)
-            try:
-                # eagerly evaluate the expression generator
-                # to flush out unexpected EOF
-                return list(Reader(self.ns).read_all(line))
-            except EOF:
-                s += '\n' + input(PROMPT_2)
+        """
+        Reads the forms in a line of input, prompting for continuation lines
+        while a form is incomplete. The reader resumes where it left off, so
+        only new input is read.
+        """
+        reader = Reader(self.ns)
+
+        def lines():
+            yield input(PROMPT_1) + '\n'
+            while reader.is_incomplete(stream):
+                yield input(PROMPT_2) + '\n'
+
+        stream = IterStream(lines(), '<repl>')
+        return list(reader.read_all(stream))
@@ -1,17 +1,85 @@
-from kaa.evaluator import Evaluator
+from contextvars import copy_context
+from threading import Lock
+
+from kaa.compiler import Compiler
+from kaa.evaluator import Evaluator, EVENT_LOOP
 from kaa.ns import Namespace
+from kaa.parser import parse
 from kaa.reader import Reader
+from kaa.stream import CharStream
+
+
+ENGINES = {
+    'evaluator': Evaluator,
+    'compiler': Compiler,
+}
 
 
 class Runtime:
-    def __init__(self):
-        self.ns = Namespace('main')
+    """
+    Evaluates code in a namespace, `main` by default.
+
+    A runtime can be used by multiple threads at once. Each evaluation gets
+    its own evaluator, while namespaces are shared: definitions are visible
+    to every thread, and a namespace imported by several threads at once is
+    only loaded once. As with Python code, only one thread runs kaa code at a
+    time, so threads help with I/O-bound work; for CPU-bound work, see
+    `kaa.parallel`. A `profiler` should only be used from one thread.
+
+    Async evaluations (see `eval_string_async`) each hold a thread of the
+    runtime's own pool while they run, up to `async_workers` at once; any
+    more wait for one to finish.
+    """
+
+    def __init__(self, engine=Evaluator, profiler=None, ns_name='main', async_workers=256):
+        self.ns = Namespace(ns_name)
+        self.engine = engine
+        # Records calls made while evaluating, if given (see `kaa.profiler`)
+        self.profiler = profiler
+        self.async_workers = async_workers
+        self._async_executor = None
+        self._async_executor_lock = Lock()
 
     def eval_file(self, f):
-        return self.eval_all(Reader(self.ns).read_file(f))
+        return self.eval_stream(CharStream(f.read(), f.name))
 
     def eval_string(self, s):
-        return self.eval_all(Reader(self.ns).read_string(s))
+        return self.eval_stream(CharStream(s))
+
+    def eval_stream(self, stream):
+        # Parsed as they're read, so top-level symbols know where they were read
+        forms = Reader(self.ns).read_all_with_sources(stream)
+        return self.eval_all(parse(form, self.ns.scope, source) for form, source in forms)
+
+    async def eval_string_async(self, s):
+        """
+        Evaluates `s` in a worker thread, so the event loop carries on running
+        while it's evaluated. `(await …)` forms wait for awaitables run on the
+        event loop, so evaluations can overlap while they wait for I/O.
+        """
+        import asyncio  # pylint: disable=import-outside-toplevel
+        loop = asyncio.get_running_loop()
+        token = EVENT_LOOP.set(loop)
+        try:
+            # The context is copied for the worker thread, as `asyncio.to_thread`
+            # does, but the loop's default executor has too few threads to let
+            # many evaluations wait at once
+            return await loop.run_in_executor(self.async_executor(), copy_context().run,
+                                              self.eval_string, s)
+        finally:
+            EVENT_LOOP.reset(token)
+
+    def async_executor(self):
+        "Returns the pool of threads async evaluations run in, creating it on first use."
+        with self._async_executor_lock:
+            if self._async_executor is None:
+                # Slow to import, and only needed for async evaluations
+                from concurrent.futures import ThreadPoolExecutor  # pylint: disable=import-outside-toplevel
+                self._async_executor = ThreadPoolExecutor(self.async_workers, 'kaa-async')
+            return self._async_executor
 
     def eval_all(self, exprs):
-        return Evaluator(self.ns).evaluate_all(exprs)
+        if self.profiler:
+            with self.profiler:
+                return self.engine(self.ns).evaluate_all(exprs)
+        return self.engine(self.ns).evaluate_all(exprs)
@@ -1,13 +1,27 @@
+from bisect import bisect_right
+import re
+
+
+NEWLINE = re.compile('\n')
+
+
 class CharStream:
-    def __init__(self, source):
+    """
+    Text buffer read by `Reader`. `col` is the position of the next unread
+    character in `source`.
+    """
+
+    def __init__(self, source, filename='<none>'):
         self.source = source
         self.col = 0
+        self.filename = filename
+        self.line_offsets = None
 
     def peek_char(self):
-        try:
-            return self.source[self.col]
-        except IndexError:
-            return None
+        while self.col >= len(self.source):
+            if not self.more():
+                return None
+        return self.source[self.col]
 
     def pop_char(self):
         c = self.peek_char()
@@ -16,52 +30,51 @@ class CharStream:
         self.col += 1
         return c
 
-    def source_meta(self):
-        return SourceMeta(self.col - 1)
+    def more(self):  # pylint: disable=no-self-use
+        "Extend `source` with more input, if any. Returns False at end of input."
+        return False
 
+    def source_meta(self, pos):
+        return LazySourceMeta(self, pos)
+
+    def location(self, pos):
+        "Returns the line and column of `pos`, indexing line starts on first use."
+        if self.line_offsets is None:
+            self.line_offsets = [0] + [m.end() for m in NEWLINE.finditer(self.source)]
+        line = bisect_right(self.line_offsets, pos)
+        return line, pos - self.line_offsets[line - 1]
+
+
+class IterStream(CharStream):
+    "Stream over an iterable of lines, e.g. a file. Lines are buffered as they're needed."
 
-class IterStream:
     def __init__(self, lines, filename=None):
-        self.lines = (CharStream(line) for line in lines)
-        self.filename = filename
+        super().__init__('', filename)
+        self.lines = iter(lines)
         self.line_num = 0
-        self.peeked_line = None
-        self.line = self.pop_line()
+        # (buffer offset, line number) of each line start in `source`
+        self.line_starts = []
 
-    def peek_char(self):
-        c = self.line.peek_char()
-        if not c:
-            line = self.peek_line()
-            if line:
-                c = line.peek_char()
-        return c
-
-    def pop_char(self):
+    def more(self):
         try:
-            return self.line.pop_char()
-        except StreamEmpty:
-            return self.pop_line().pop_char()
-
-    def peek_line(self):
-        if not self.peeked_line:
-            try:
-                self.peeked_line = next(self.lines)
-            except StopIteration:
-                pass
-        return self.peeked_line
-
-    def pop_line(self):
-        line = self.peek_line()
-        if not line:
-            raise StreamEmpty()
-        self.line = line
+            line = next(self.lines)
+        except StopIteration:
+            return False
         self.line_num += 1
-        self.peeked_line = None
-        return line
+        # Drop consumed input, along with the starts of lines that are no
+        # longer in the buffer (other than the one it now starts within)
+        consumed = self.col
+        starts = [(offset - consumed, line_num) for offset, line_num in self.line_starts]
+        first = max((i for i, (offset, _) in enumerate(starts) if offset <= 0), default=0)
+        self.line_starts = starts[first:]
+        self.line_starts.append((len(self.source) - consumed, self.line_num))
+        self.source = self.source[consumed:] + line
+        self.col = 0
+        return True
 
-    def source_meta(self):
-        line_meta = self.line.source_meta()
-        return SourceMeta(line_meta.col, self.line_num, self.filename)
+    def source_meta(self, pos):
+        offset, line_num = next(start for start in reversed(self.line_starts) if start[0] <= pos)
+        return SourceMeta(pos - offset, line_num, self.filename)
 
 
 class StreamEmpty(Exception):
@@ -76,3 +89,24 @@ class SourceMeta:
 
     def __str__(self):
         return '%s:%s:%s' % (self.filename, self.line, self.col)
+
+
+class LazySourceMeta(SourceMeta):
+    "Source location in a `CharStream`. Line and column are looked up when first needed."
+
+    def __init__(self, stream, pos):  # pylint: disable=super-init-not-called
+        self.stream = stream
+        self.pos = pos
+        self.filename = stream.filename
+
+    @property
+    def line(self):
+        return self.stream.location(self.pos)[0]
+
+    @property
+    def col(self):
+        return self.stream.location(self.pos)[1]
+
+    def __reduce__(self):
+        # Pickle without the stream's text
+        return SourceMeta, (self.col, self.line, self.filename)
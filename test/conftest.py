@@ -0,0 +1,10 @@
+from pytest import fixture
+
+from kaa.compiler import Compiler
+from kaa.evaluator import Evaluator
+
+
+# Both engines should behave identically
+@fixture(name='engine', params=[Evaluator, Compiler])
+def engine_fixture(request):
+    return request.param
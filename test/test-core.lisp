@@ -20,4 +20,33 @@
 
 (expect (not (= (gensym) (gensym))))
 
+(expect (= 6 (+ 1 2 3)))
+(expect (= -1 (- 1)))
+(expect (= 1 (- 3 2)))
+(expect (= 0 (- 3 2 1)))
+(expect (= 24 (* 2 3 4)))
+(expect (= 1 (* 2 (/ 2))))
+(expect (= 2 (/ 6 3)))
+(expect (= 1 (/ 12 3 4)))
+(expect (< 1 2))
+(expect (< 1 2 3))
+(expect (not (< 1 3 2)))
+(expect (<= 1 1 2))
+(expect (> 3 2 1))
+(expect (not (> 1 1)))
+(expect (>= 2 2 1))
+(expect (= 1 1 1))
+(expect (not (= 1 1 2)))
+
+(expect (lazy-seq? (range)))
+(expect (= '(0 1 4) (to-list (take 3 (map (lambda (x) (* x x)) (range))))))
+(expect (= '(2 4) (to-list (filter (lambda (x) (> x 1)) '(1 2 4)))))
+(expect (= 2 (first (rest (range 1 5)))))
+(expect (= 10 (reduce + (range 5))))
+(expect (= 11 (reduce + 1 (range 5))))
+(def streamed (range 5))
+(expect (= 10 (reduce + streamed)))
+(expect-raises py/ValueError (reduce + streamed))
+(expect (empty? (take 0 (range))))
+
 (println " done")
@@ -0,0 +1,74 @@
+from pytest import fixture, raises
+
+from kaa import array
+from kaa.core import List
+from kaa.runtime import Runtime
+
+
+@fixture(name='runtime')
+def runtime_fixture():
+    runtime = Runtime()
+    runtime.eval_string('(import kaa.array as a)')
+    return runtime
+
+
+def test_array_namespace(runtime):
+    assert runtime.eval_string('(a/sum (a/mul (a/from-list (list 1 2 3)) 2))') == 12
+    assert runtime.eval_string('(a/to-list (a/add (a/range 3) (a/range 3)))') == List([0, 2, 4])
+    assert runtime.eval_string('(a/mean (a/from-list (list 1 2)))') == 1.5
+    assert runtime.eval_string('(a/array? (a/zeros 2))')
+    assert not runtime.eval_string('(a/array? (list 1 2))')
+
+
+def test_array_slice_is_view(runtime):
+    runtime.eval_string('(def xs (a/range 10))')
+    runtime.eval_string('(def evens (a/slice xs 0 None 2))')
+    assert runtime.eval_string('(a/to-list evens)') == List([0, 2, 4, 6, 8])
+    runtime.eval_string('(a/set evens 1 -2)')
+    assert runtime.eval_string('(a/get xs 2)') == -2
+
+
+@fixture(name='fallback')
+def fallback_fixture(monkeypatch):
+    "Use the stdlib `array` implementation even if NumPy is installed."
+    monkeypatch.setattr(array, 'numpy', None)
+
+
+@fixture(name='xs')
+def xs_fixture(fallback):  # pylint: disable=unused-argument
+    return array.from_list([1, 2, 3, 4, 5, 6])
+
+
+def test_fallback_elementwise(xs):
+    assert isinstance(xs, array.Array)
+    assert (xs + xs).tolist() == [2, 4, 6, 8, 10, 12]
+    assert (10 - xs).tolist() == [9, 8, 7, 6, 5, 4]
+    assert (xs * 1.5).data.typecode == 'd'
+    assert (xs / 2).tolist() == [0.5, 1, 1.5, 2, 2.5, 3]
+    assert (-xs).tolist() == [-1, -2, -3, -4, -5, -6]
+    with raises(ValueError):
+        array.add(xs, xs[1:])
+
+
+def test_fallback_views(xs):
+    view = xs[::-2][1:]
+    assert view.tolist() == [4, 2]
+    assert array.get(view, -1) == 2
+    array.set_(view, 0, 40)
+    assert xs.tolist() == [1, 2, 3, 40, 5, 6]
+    assert view.data is xs.data
+
+
+def test_fallback_reductions(xs):
+    assert array.sum_(xs) == 21
+    assert array.prod(xs) == 720
+    assert array.min_(xs[1:]) == 2
+    assert array.max_(xs) == 6
+    assert array.mean(xs) == 3.5
+
+
+def test_fallback_construction(fallback):  # pylint: disable=unused-argument
+    assert array.zeros(3).tolist() == [0.0, 0.0, 0.0]
+    assert array.range_(2, 8, 3).tolist() == [2, 5]
+    assert array.from_list(List([1, 2]), 'float').data.typecode == 'd'
+    assert array.to_list(array.from_list([1.5])) == List([1.5])
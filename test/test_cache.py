@@ -0,0 +1,43 @@
+import os
+
+from kaa.cache import cache_path, read_forms
+from kaa.core import List, Symbol
+from kaa.ns import Namespace
+from kaa.reader import resolve_symbols
+
+
+def test_read_forms_caches(tmp_path, monkeypatch):
+    monkeypatch.setattr('sys.dont_write_bytecode', False)
+    path = tmp_path / 'cached.lisp'
+    path.write_text('(foo bar/baz)\n(if 1 2)\n')
+    forms = read_forms(str(path))
+    assert forms == [List([Symbol('foo'), Symbol('baz', 'bar')]),
+                     List([Symbol('if'), 1, 2])]
+    assert os.path.exists(cache_path(str(path)))
+    cached = read_forms(str(path))
+    assert cached == forms
+    assert str(cached[1].meta['source']) == f'{path}:2:0'
+
+
+def test_read_forms_invalidated_by_change(tmp_path, monkeypatch):
+    monkeypatch.setattr('sys.dont_write_bytecode', False)
+    path = tmp_path / 'changed.lisp'
+    path.write_text('1')
+    assert read_forms(str(path)) == [1]
+    path.write_text('(2)')
+    assert read_forms(str(path)) == [List([2])]
+
+
+def test_read_forms_without_writing_cache(tmp_path, monkeypatch):
+    monkeypatch.setattr('sys.dont_write_bytecode', True)
+    path = tmp_path / 'uncached.lisp'
+    path.write_text('1')
+    assert read_forms(str(path)) == [1]
+    assert not os.path.exists(cache_path(str(path)))
+
+
+def test_resolve_symbols():
+    ns = Namespace('testing')
+    form = List([Symbol('if'), Symbol('foo'), Symbol('defun')])
+    assert resolve_symbols(form, ns) == List([
+        Symbol('if'), Symbol('foo', 'testing'), Symbol('defun', 'kaa.core')])
@@ -0,0 +1,23 @@
+from kaa.compiler import Compiler
+from kaa.evaluator import Evaluator
+from kaa.ns import Namespace
+from testing_utils import evaluate_string
+
+
+def test_evaluator_interop():
+    ns = Namespace('testing')
+    evaluate_string(Evaluator(ns), '(defun evaluated-inc (x) (+ x 1))')
+    evaluate_string(Compiler(ns), '(defun compiled-inc (x) (evaluated-inc x))')
+    assert evaluate_string(Evaluator(ns), '(compiled-inc 1)') == 2
+
+
+def test_compiled_lambdas_are_python_callables():
+    inc = evaluate_string(Compiler(Namespace('testing')), '(lambda (x) (+ x 1))')
+    assert list(map(inc, (1, 2))) == [2, 3]
+
+
+def test_closures_are_lexically_scoped():
+    assert evaluate_string(Compiler(Namespace('testing')), '''
+        (defun adder (x) (lambda (y) (lambda (z) (+ x y z))))
+        (((adder 1) 2) 3)
+    ''') == 6
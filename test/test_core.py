@@ -1,10 +1,33 @@
-from kaa.core import List, Symbol
+import pickle
+
+from pytest import raises
+
+from kaa.core import (add, concat, div, empty, eql, filter_, first, ge, gensym, LazySeq, lines,
+                      List, lt, map_, range_, reduce_, rest, SeqConsumed, sub, Symbol, take,
+                      to_list)
 
 
 def test_list_python_interop():
     l = List((1, 2))
     assert l[1] == 2
     assert isinstance(l[1:], List)
+    assert l == [1, 2]
+    assert l[-1] == 2
+    assert list(l[::-1]) == [2, 1]
+
+
+def test_list_rest_shares_items():
+    l = List(range(5))
+    tail = rest(rest(l))
+    assert tail == List((2, 3, 4))
+    assert tail.items is l.items
+    assert tail[-3] == 2
+    assert repr(tail[1:]) == '(3 4)'
+
+
+def test_concat():
+    assert concat(List((1,)), None, List(), List((2, 3))) == List((1, 2, 3))
+    assert concat() == List()
 
 
 def test_symbol_equality():
@@ -13,3 +36,76 @@ def test_symbol_equality():
     assert Symbol('foo') != Symbol('foo', 'ns')
     assert Symbol('foo', 'ns1') != Symbol('foo', 'ns2')
     assert Symbol('foo', 'ns') == Symbol('foo', 'ns')
+
+
+def test_symbols_are_interned():
+    sym = Symbol('foo', 'ns')
+    assert Symbol('foo', 'ns') is sym
+    assert sym.in_ns(None) is Symbol('foo')
+    assert pickle.loads(pickle.dumps(sym)) is sym
+    assert not hasattr(sym, '__dict__')
+
+
+def test_gensyms_are_uninterned():
+    sym = gensym()
+    assert Symbol(sym.name) is not sym
+    assert sym != Symbol(sym.name)
+    unpickled = pickle.loads(pickle.dumps([sym, sym]))
+    assert unpickled[0] is unpickled[1] is not Symbol(sym.name)
+
+
+def test_arithmetic_arities():
+    assert add() == 0
+    assert add(1) == 1
+    assert add(1, 2, 3) == 6
+    assert sub(5) == -5
+    assert sub(5, 1, 1) == 3
+    assert div(4) == 0.25
+    assert div(8, 2, 2) == 2
+    with raises(TypeError):
+        sub()
+
+
+def test_comparison_arities():
+    assert eql(1) and lt(1) and ge()
+    assert lt(1, 2, 3)
+    assert not lt(1, 3, 2)
+    assert ge(3, 3, 1)
+    assert not eql(1, 1, 2)
+
+
+def test_lazy_seq_realises_on_demand():
+    pulled = []
+    def numbers():
+        for i in range(3):
+            pulled.append(i)
+            yield i
+    seq = LazySeq(numbers())
+    assert not pulled
+    assert first(rest(seq)) == 1
+    assert pulled == [0, 1]
+    assert to_list(seq) == List((0, 1, 2))
+    assert to_list(seq) == List((0, 1, 2))
+    assert empty(rest(rest(rest(seq))))
+
+
+def test_lazy_seq_streams_once():
+    seq = map_(str, range(3))
+    assert list(seq) == ['0', '1', '2']
+    with raises(SeqConsumed):
+        first(seq)
+    with raises(SeqConsumed):
+        list(seq)
+
+
+def test_lazy_seq_pipeline():
+    odd_squares = filter_(lambda x: x % 2, map_(lambda x: x * x, range_()))
+    assert reduce_(add, take(4, odd_squares)) == 1 + 9 + 25 + 49
+    assert reduce_(add, 10, range_(0)) == 10
+    assert repr(take(3, range_(5, 10))) == '(5 6 7)'
+
+
+def test_lines(tmp_path):
+    path = tmp_path / 'text'
+    path.write_text('one\ntwo\n')
+    assert to_list(lines(str(path))) == ['one', 'two']
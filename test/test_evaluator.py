@@ -1,14 +1,14 @@
-from pytest import fixture, raises
+from pytest import fixture, mark, raises
 
-from kaa.evaluator import Evaluator, UnboundSymbol, WrongArity
+from kaa.evaluator import UnboundSymbol, WrongArity
 from kaa.ns import Namespace
 from kaa.parser import Raise
-from testing_utils import read
+from testing_utils import evaluate_string, read
 
 
 @fixture(name='evaluator')
-def evaluator_fixture():
-    return Evaluator(Namespace('test'))
+def evaluator_fixture(engine):
+    return engine(Namespace('test'))
 
 
 def test_lambda_invocation_wrong_arity(evaluator):
@@ -28,7 +28,68 @@ def test_raises(evaluator):
 def test_unbound_symbol_raises_error(evaluator):
     with raises(UnboundSymbol):
         evaluator.evaluate(read('foo'))
+    with raises(UnboundSymbol, match='testing/foo at <none>:1:3'):
+        evaluator.evaluate(read('(+ foo 1)'))
+
+
+@mark.parametrize('source, location', [
+    ('(if foo 1 2)', '1:4'),
+    ('(if True foo)', '1:9'),
+    ('(def x foo)', '1:7'),
+    ('(raise foo)', '1:7'),
+    ('(try foo (except py/KeyError 1))', '1:5'),
+    ('((lambda () 1 foo))', '1:14'),
+    ('(def f (lambda () foo)) (f)', '1:18'),
+])
+def test_unbound_symbol_location(evaluator, source, location):
+    with raises(UnboundSymbol, match=f'test/foo at <none>:{location}'):
+        evaluate_string(evaluator, source)
 
 
 def test_python_literal(evaluator):
     assert evaluator.evaluate(read('py/Exception')) == Exception
+    assert evaluator.evaluate(read('py/str.upper')) == str.upper
+    with raises(UnboundSymbol):
+        evaluator.evaluate(read('py/no-such-builtin'))
+
+
+def test_tail_calls_run_in_constant_stack(evaluator):
+    assert evaluate_string(evaluator, '''
+        (defun count-down (n)
+          (let ((m n))
+            (if (= m 0) m (count-down (+ m -1)))))
+        (count-down 1000)
+    ''') == 0
+
+
+def test_lambdas_are_lexically_scoped(evaluator):
+    with raises(UnboundSymbol):
+        evaluate_string(evaluator, '''
+            (defun get-local () local)
+            (let ((local 1)) (get-local))
+        ''')
+
+
+def test_macro_expanded_once_per_call_site(evaluator):
+    evaluate_string(evaluator, '''
+        (def expansions 0)
+        (defmacro m ()
+          (def expansions (+ expansions 1))
+          1)
+        (defun f () (m))
+        (f)
+        (f)
+    ''')
+    assert evaluate_string(evaluator, 'expansions') == 1
+    assert evaluate_string(evaluator, '''
+        (defmacro m () 2)
+        (f)
+    ''') == 2
+
+
+def test_macro_defined_after_use(evaluator):
+    assert evaluate_string(evaluator, '''
+        (defun f () (m 1))
+        (defmacro m (x) `(+ ~x 1))
+        (f)
+    ''') == 2
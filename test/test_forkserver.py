@@ -0,0 +1,100 @@
+import os
+import signal
+import subprocess
+import sys
+import time
+
+from pytest import fixture, mark
+
+
+@fixture(name='server')
+def server_fixture(tmp_path):
+    "Runs a server that preloads namespace `warm`, which clients can't find."
+    (tmp_path / 'warm').mkdir()
+    (tmp_path / 'warm' / 'warm.lisp').write_text('(def value 42)\n')
+    path = str(tmp_path / 'kaa.sock')
+    env = dict(os.environ, PYTHONPATH=os.pathsep.join([str(tmp_path / 'warm')] + sys.path))
+    with subprocess.Popen([sys.executable, '-m', 'kaa.main', f'--server={path}',
+                           '--preload=warm'], env=env) as process:
+        while not os.path.exists(path):
+            assert process.poll() is None
+            time.sleep(0.01)
+        yield path
+        process.terminate()
+    assert not os.path.exists(path)
+
+
+def kaa(server, *args, path=(), **kwargs):
+    "Runs a client, with `path` added to its PYTHONPATH."
+    return subprocess.run([sys.executable, '-m', 'kaa.main', *args], env=client_env(server, path),
+                          capture_output=True, text=True, check=False, **kwargs)
+
+
+def kaa_process(server, *args):
+    "Starts a client in the background."
+    return subprocess.Popen([sys.executable, '-m', 'kaa.main', *args], env=client_env(server),
+                            stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+
+
+def client_env(server, path=()):
+    return dict(os.environ, KAA_SERVER=server, PYTHONPATH=os.pathsep.join([*path, *sys.path]))
+
+
+def wait_for(path):
+    while not os.path.exists(path):
+        time.sleep(0.01)
+
+
+def test_run_in_server(server, tmp_path):
+    result = kaa(server, '-e', '(import warm) (println warm/value)')
+    assert (result.returncode, result.stdout) == (0, '42\n')
+    (tmp_path / 'hello.lisp').write_text('(println "hello")')
+    result = kaa(server, 'hello.lisp', cwd=tmp_path)
+    assert (result.returncode, result.stdout) == (0, 'hello\n')
+    result = kaa(server, input='(println "stdin")')
+    assert (result.returncode, result.stdout) == (0, 'stdin\n')
+
+
+def test_client_path(server, tmp_path):
+    "Namespaces are found on the client's path, not the server's."
+    (tmp_path / 'client').mkdir()
+    (tmp_path / 'client' / 'mod.lisp').write_text('(def value 1)\n')
+    result = kaa(server, '-e', '(import mod) (println mod/value)', path=[str(tmp_path / 'client')])
+    assert (result.returncode, result.stdout) == (0, '1\n')
+
+
+def test_exit_status(server):
+    result = kaa(server, '-e', '(raise "oh no")')
+    assert result.returncode == 1
+    assert 'RuntimeError: oh no' in result.stderr
+    assert kaa(server, '--no-such-option').returncode == 2
+
+
+def test_killed_client(server, tmp_path):
+    "The server carries on serving after a client is killed mid-request."
+    started = tmp_path / 'started'
+    with kaa_process(server, '-e', f'(import py/os) (import py/time) (os/mkdir "{started}") '
+                                   '(time/sleep (/ 2 10))') as client:
+        wait_for(started)
+        client.kill()
+    time.sleep(0.5)
+    assert os.path.exists(server)
+    assert kaa(server, '-e', '(println 1)').stdout == '1\n'
+
+
+@mark.parametrize('signum', [signal.SIGINT, signal.SIGTERM])
+def test_signals_forwarded(server, tmp_path, signum):
+    "Signals to a client stop its child."
+    started, finished = tmp_path / 'started', tmp_path / 'finished'
+    with kaa_process(server, '-e', f'(import py/os) (import py/time) (os/mkdir "{started}") '
+                                   f'(time/sleep (/ 3 10)) (os/mkdir "{finished}")') as client:
+        wait_for(started)
+        client.send_signal(signum)
+        assert client.wait() in (-signum, 128 + signum)
+    time.sleep(0.5)
+    assert not os.path.exists(finished)
+
+
+def test_no_server(tmp_path):
+    result = kaa(str(tmp_path / 'no-server.sock'), '-e', '(println 1)')
+    assert (result.returncode, result.stdout) == (0, '1\n')
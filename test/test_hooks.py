@@ -0,0 +1,106 @@
+from pytest import fixture, raises
+
+from kaa import hooks
+from kaa.compiler import Compiler
+from kaa.parser import If
+from kaa.runtime import Runtime
+
+
+class Recorder(hooks.Hook):
+    def __init__(self, events=hooks.Hook.events):
+        self.events = events
+        self.log = []
+
+    def enter(self, event, target, source):
+        self.log.append(('enter', event, type(target).__name__, str(source)))
+
+    def exit(self, event, target, source):
+        self.log.append(('exit', event, type(target).__name__, str(source)))
+
+
+@fixture(name='runtime')
+def runtime_fixture(engine):
+    return Runtime(engine)
+
+
+@fixture(name='recorder')
+def recorder_fixture():
+    recorder = Recorder()
+    hooks.register(recorder)
+    yield recorder
+    hooks.unregister(recorder)
+
+
+def test_form_events(runtime, recorder):
+    runtime.eval_string("(if 1\n  '2)")
+    assert recorder.log == [
+        ('enter', 'form', 'If', '<none>:1:0'),
+        ('enter', 'form', 'Quote', '<none>:2:2'),
+        ('exit', 'form', 'Quote', '<none>:2:2'),
+        ('exit', 'form', 'If', '<none>:1:0'),
+    ]
+
+
+def test_call_and_macro_events(runtime, recorder):
+    runtime.eval_string('(def f (lambda (x) x))\n(defmacro m (x) x)')
+    recorder.log.clear()
+    runtime.eval_string('(f (m 1))')
+    assert [entry[:2] for entry in recorder.log
+            if entry[1] != 'form'] == [
+                ('enter', 'macro'), ('exit', 'macro'),
+                ('enter', 'call'), ('exit', 'call'),
+            ]
+    assert ('enter', 'call', type(runtime.eval_string('f')).__name__, '<none>:1:7') \
+        in recorder.log
+
+
+def test_exit_on_exception(runtime, recorder):
+    with raises(RuntimeError):
+        runtime.eval_string('(if 1 (raise "oops"))')
+    assert [entry[:2] for entry in recorder.log] == [('enter', 'form'), ('enter', 'form'),
+                                                     ('exit', 'form'), ('exit', 'form')]
+
+
+def test_hook_event_filter(runtime):
+    recorder = Recorder(events=('call',))
+    hooks.register(recorder)
+    try:
+        runtime.eval_string('((lambda () (if 1 2)))')
+    finally:
+        hooks.unregister(recorder)
+    assert [entry[:2] for entry in recorder.log] == [('enter', 'call'), ('exit', 'call')]
+
+
+def test_unregistered_hook_not_notified(runtime):
+    recorder = Recorder()
+    hooks.register(recorder)
+    hooks.unregister(recorder)
+    runtime.eval_string('(if 1 2)')
+    assert not recorder.log
+    assert not hooks.FORM_HOOKS
+
+
+def test_tail_position_forms_reported():
+    recorder = Recorder(events=('form',))
+    runtime = Runtime()
+    runtime.eval_string('(def f (lambda () (if 1 2 3)))')
+    hooks.register(recorder)
+    try:
+        runtime.eval_string('(f)')
+    finally:
+        hooks.unregister(recorder)
+    assert ('enter', 'form', If.__name__, '<none>:1:18') in recorder.log
+
+
+def test_unregistered_after_compile_not_notified():
+    recorder = Recorder(events=('form',))
+    runtime = Runtime(Compiler)
+    hooks.register(recorder)
+    try:
+        runtime.eval_string('(def f (lambda () (if 1 2 3)))')
+        runtime.eval_string('(f)')
+    finally:
+        hooks.unregister(recorder)
+    del recorder.log[:]
+    runtime.eval_string('(f)')
+    assert not recorder.log
@@ -1,5 +1,9 @@
+from threading import Thread
+
+from pytest import raises
+
 from kaa.core import Symbol
-from kaa.ns import Namespace
+from kaa.ns import CyclicImport, Namespace, REGISTRY
 
 
 def test_define():
@@ -61,3 +65,53 @@ def test_lookup():
     ns[Symbol('x', 'testing')] = 42
     assert ns[Symbol('x', 'testing')] == 42
     assert ns[Symbol('defun', 'kaa.core')] is not None
+
+
+def test_load_ns_once():
+    ns = Namespace('testing', import_core=False)
+    assert ns.load_ns('kaa.core') is ns.load_ns('kaa.core')
+    assert Namespace('other').imported_namespaces['kaa.core'] is ns.load_ns('kaa.core')
+
+
+def test_load_ns_while_loading_another():
+    "Loaded namespaces don't wait for one that's being loaded in another thread."
+    REGISTRY.load('kaa.core')
+    loaded = []
+    with REGISTRY.lock:
+        thread = Thread(target=lambda: loaded.append(REGISTRY.load('kaa.core')))
+        thread.start()
+        thread.join(5)
+    assert loaded
+
+
+def test_reload_ns(tmp_path, monkeypatch):
+    monkeypatch.syspath_prepend(str(tmp_path))
+    (tmp_path / 'reloadable.lisp').write_text('(def x 1)')
+    ns = Namespace('testing', import_core=False)
+    loaded = ns.load_ns('reloadable')
+    (tmp_path / 'reloadable.lisp').write_text('(def x 2)')
+    assert ns.load_ns('reloadable') is loaded
+    assert loaded[Symbol('x', 'reloadable')] == 1
+    assert ns.load_ns('reloadable', reload=True) is loaded
+    assert loaded[Symbol('x', 'reloadable')] == 2
+
+
+def test_cyclic_import(tmp_path, monkeypatch):
+    monkeypatch.syspath_prepend(str(tmp_path))
+    (tmp_path / 'cycle_a.lisp').write_text('(import cycle_b)')
+    (tmp_path / 'cycle_b.lisp').write_text('(import cycle_a)')
+    with raises(CyclicImport, match='cycle_a -> cycle_b -> cycle_a'):
+        Namespace('testing', import_core=False).load_ns('cycle_a')
+    assert 'cycle_a' not in REGISTRY
+
+
+def test_cell():
+    ns = Namespace('testing')
+    cell = ns.cell(Symbol('x', 'testing'))
+    assert not cell.is_bound()
+    assert Symbol('x', 'testing') not in ns
+    ns[Symbol('x')] = 42
+    assert cell.value == 42
+    assert ns.cell(Symbol('x')) is cell
+    assert ns.cell(Symbol('defun', 'kaa.core')) is ns.load_ns('kaa.core').cell(Symbol('defun'))
+    assert ns.cell(Symbol('unknown', 'elsewhere')) is None
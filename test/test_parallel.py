@@ -0,0 +1,62 @@
+import pickle
+
+from pytest import fixture
+
+from kaa.core import List
+from kaa.parallel import dumps
+from kaa.runtime import Runtime
+
+
+@fixture(name='runtime')
+def runtime_fixture(engine):
+    runtime = Runtime(engine)
+    runtime.eval_string('''
+        (import kaa.parallel as p)
+        (defmacro twice (x) `(* 2 ~x))
+        (defun square (x) (twice (* x x)))
+    ''')
+    return runtime
+
+
+def test_pickle_lambda(runtime):
+    f = runtime.eval_string('(let ((n 3)) (lambda (x) (+ n (square x))))')
+    g = pickle.loads(dumps(f))
+    assert g is not f
+    assert g(2) == f(2) == 11
+    assert str(g.source) == str(f.source) == '<none>:1:13'
+
+
+def test_pickle_namespace_definitions(runtime):
+    runtime.eval_string('(def k 10)')
+    ns = pickle.loads(dumps(runtime.ns))
+    assert ns is not runtime.ns
+    assert Runtime(runtime.engine).engine(ns).evaluate(
+        runtime.eval_string("'(+ k (square 2))")) == 18
+
+
+def test_pmap(runtime):
+    assert runtime.eval_string('(p/pmap square (range 5) 2)') == List([0, 2, 8, 18, 32])
+
+
+def test_preduce(runtime):
+    assert runtime.eval_string('(p/preduce + (range 10))') == 45
+    assert runtime.eval_string('(p/preduce + 1 (range 10))') == 46
+    assert runtime.eval_string('(p/preduce + 1 ())') == 1
+
+
+def test_pickle_only_referenced_definitions(runtime):
+    runtime.eval_string('''
+        (def k 10)
+        (defmacro add-k (x) `(+ k ~x))
+        (defun f (x) (add-k (square x)))
+        (def unrelated 0)
+    ''')
+    g = pickle.loads(dumps(runtime.eval_string('f')))
+    assert g(2) == 18
+    assert set(sym.name for sym in g.ns.defs) == {'k', 'add-k', 'square', 'twice'}
+
+
+def test_pmap_with_unpicklable_definition(runtime, tmp_path):
+    (tmp_path / 'data').write_text('1\n2\n')
+    runtime.eval_string(f'(def data (map py/int (lines "{tmp_path / "data"}")))')
+    assert runtime.eval_string('(p/pmap square (list 1 2 3))') == List([2, 8, 18])
@@ -1,7 +1,9 @@
 from pytest import mark, raises
 
 from kaa.core import Symbol
-from kaa.parser import Lambda, Params, parse_def, parse_lambda, parse_params, ParseError
+from kaa.ns import Namespace
+from kaa.parser import Call, Global, If, Lambda, Params, parse, parse_def, parse_lambda, \
+    parse_params, ParseError
 from testing_utils import read
 
 
@@ -67,9 +69,51 @@ def test_parse_lambda():
     parsed = parse_lambda(read('(lambda (foo) bar)'))
     assert isinstance(parsed, Lambda)
     assert isinstance(parsed.params, Params)
-    assert tuple(parsed.body) == ((Symbol('bar', 'testing'),))
+    assert isinstance(parsed.body[0], Global)
+    assert parsed.body[0].symbol == Symbol('bar', 'testing')
+
+
+def test_parse_lambda_captures_free_vars():
+    outer = parse_lambda(read('(lambda (a b c) (lambda (d) c a d e))'))
+    inner = outer.body[0]
+    assert inner.captures == (2, 0)
+    c, a, d, e = inner.body
+    assert (c.index, a.index, d.index) == (1, 2, 0)
+    assert isinstance(e, Global)
+
+
+def test_parse_lambda_captures_all_for_macro_calls():
+    outer = parse_lambda(read('(lambda (a b) (lambda () (m)))'))
+    assert outer.body[0].captures == (0, 1)
+
+
+def test_parse_lambda_captures_referenced_for_function_and_macro_calls():
+    ns = Namespace('testing')
+    outer = parse(read('(lambda (a b c d e f g) (lambda (x) (+ x a)))'), ns.scope)
+    assert outer.body[0].captures == (0,)
+    outer = parse(read('(lambda (a b) (lambda () (let ((c 1)) (+ b c))))'), ns.scope)
+    assert outer.body[0].captures == (1,)
+    outer = parse(read('(lambda (a b) (lambda () (m)))'), ns.scope)
+    assert outer.body[0].captures == (0, 1)
 
 
 def test_parse_invalid_lambda():
     with raises(ParseError):
         parse_lambda(read('(lambda ((3)))'))
+    with raises(ParseError, match='params must be a list of symbols at <none>:1:8'):
+        parse_lambda(read('(lambda x 1)'))
+
+
+def test_parse_caches_node():
+    form = read('(if a (b c) d)')
+    node = parse(form)
+    assert isinstance(node, If)
+    assert isinstance(node.then, Call)
+    assert parse(form) is node
+
+
+def test_parse_call_args_lazily():
+    node = parse(read('(foo (if))'))
+    assert isinstance(node, Call)
+    with raises(ParseError):
+        node.args  # pylint: disable=pointless-statement
@@ -0,0 +1,58 @@
+from itertools import count
+
+from kaa.evaluator import Evaluator
+from kaa.profiler import Profiler
+from kaa.runtime import Runtime
+
+
+SOURCE = '''
+(defun count-down (n)
+  (if (= n 0)
+      'done
+    (count-down (+ n -1))))
+
+(defun fact (n)
+  (if (= n 0)
+      1
+    (* n (fact (+ n -1)))))
+
+(count-down 3)
+(fact 2)
+'''
+
+
+def test_profile_counts_calls(engine):
+    profiler = Profiler()
+    Runtime(engine, profiler).eval_string(SOURCE)
+    calls = {stats.label: stats.calls for stats in profiler.stats.values()}
+    assert calls['count-down (<none>:2:0)'] == 4
+    assert calls['fact (<none>:7:0)'] == 3
+    assert [n for label, n in calls.items() if label.startswith('defun [macro]')] == [2]
+
+
+def test_profile_recursive_cumulative_time(engine):
+    # Each clock reading advances by 1
+    profiler = Profiler(clock=count().__next__)
+    Runtime(engine, profiler).eval_string(SOURCE)
+    fact = next(stats for stats in profiler.stats.values() if stats.label.startswith('fact'))
+    # fact(2) -> fact(1) -> fact(0): 6 clock readings, the outermost 5 apart
+    assert fact.cumulative_time == 5
+    assert fact.self_time == 5
+
+
+def test_collapsed_stacks(engine):
+    profiler = Profiler(clock=count().__next__)
+    Runtime(engine, profiler).eval_string(SOURCE)
+    stacks = dict(line.rsplit(' ', 1) for line in profiler.collapsed_stacks())
+    fact = 'fact (<none>:7:0)'
+    assert stacks[f'{fact};{fact};{fact}'] == str(1_000_000)
+
+
+def test_profiler_disabled_after_eval():
+    profiler = Profiler()
+    runtime = Runtime(Evaluator, profiler)
+    runtime.eval_string(SOURCE)
+    runtime.profiler = None
+    runtime.eval_string('(fact 3)')
+    assert next(stats.calls for stats in profiler.stats.values()
+                if stats.label.startswith('fact')) == 3
@@ -38,7 +38,8 @@ def test_read_qualified_symbol():
 
 
 def test_read_special_form():
-    assert read('def') == Symbol('def')
+    assert read('def') is Symbol('def')
+    assert read('testing/def') is Symbol('def', 'testing')
 
 
 def test_read_unclosed_list():
@@ -75,3 +76,24 @@ def test_source_meta():
     assert obj.meta['source'].filename == 'yadda'
     assert obj.meta['source'].line == 2
     assert obj.meta['source'].col == 2
+
+
+def test_read_file_source_meta(tmp_path):
+    path = tmp_path / 'yadda.lisp'
+    path.write_text('(foo)\n\n  (bar\n   baz)\n')
+    with open(path, encoding='utf-8') as f:
+        forms = list(Reader(Namespace('testing')).read_file(f))
+    assert str(forms[1].meta['source']) == f'{path}:3:2'
+    assert str(forms[1].meta['sources'][1]) == f'{path}:4:3'
+
+
+def test_read_comment_at_end_of_input():
+    reader = Reader(Namespace('testing'))
+    assert list(reader.read_string('42 ; the end')) == [42]
+
+
+def test_read_tokens_across_lines():
+    reader = Reader(Namespace('testing'))
+    lines = IterStream(('(foo "a\n', 'b" ~', '@bar)\n'))
+    splice = List([Symbol('unquote-splice'), Symbol('bar', 'testing')])
+    assert reader.read_next(lines) == List([Symbol('foo', 'testing'), 'a\nb', splice])
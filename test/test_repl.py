@@ -0,0 +1,40 @@
+from kaa.core import List, Symbol
+from kaa.profiler import Profiler
+from kaa.repl import PROMPT_1, PROMPT_2, Repl
+
+
+def input_lines(monkeypatch, lines):
+    "Feeds `lines` to `input`, then EOF, returning the prompts given."
+    prompts = []
+    lines = iter(lines)
+
+    def input_(prompt):
+        prompts.append(prompt)
+        try:
+            return next(lines)
+        except StopIteration:
+            raise EOFError from None
+    monkeypatch.setattr('builtins.input', input_)
+    return prompts
+
+
+def test_read_exprs(monkeypatch):
+    prompts = input_lines(monkeypatch, ['1 2'])
+    assert Repl().read_exprs() == [1, 2]
+    assert prompts == [PROMPT_1]
+
+
+def test_read_exprs_continuation_lines(monkeypatch):
+    prompts = input_lines(monkeypatch, ['(quote (a', '', ' "b', 'c" d)) 3'])
+    repl = Repl()
+    a, d = (repl.ns.resolve(Symbol(name)) for name in 'ad')
+    assert repl.read_exprs() == [List([Symbol('quote'), List([a, 'b\nc', d])]), 3]
+    assert prompts == [PROMPT_1, PROMPT_2, PROMPT_2, PROMPT_2]
+
+
+def test_loop_profile(monkeypatch, capsys):
+    input_lines(monkeypatch, ['(defun f () 1)', '(f)'])
+    profiler = Profiler()
+    Repl(profiler=profiler).loop()
+    assert capsys.readouterr().out.endswith('\n1\n\n')
+    assert Symbol('f') in [name for name, _ in profiler.stats]
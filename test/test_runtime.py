@@ -1,6 +1,96 @@
+import asyncio
+import sys
+import threading
+import time
+
+from pytest import mark, raises
+
+from kaa.compiler import Compiler
+from kaa.evaluator import AwaitInRunningLoop, Evaluator, UnboundSymbol
 from kaa.runtime import Runtime
 
 
 def test_initialization():
     runtime = Runtime()
     assert runtime.eval_string('(+ 1 2)') == 3
+
+
+def test_compiler_engine():
+    runtime = Runtime(Compiler)
+    assert runtime.eval_string('(+ 1 2)') == 3
+
+
+def test_top_level_symbol_location():
+    with raises(UnboundSymbol, match='main/foo at <none>:2:2'):
+        Runtime().eval_string('1\n  foo')
+
+
+def test_threads(tmp_path, monkeypatch):
+    "Evaluates from many threads at once, switching between them often."
+    (tmp_path / 'stress.lisp').write_text('(def loaded (py/object))\n(py/len (py/range 100000))\n')
+    monkeypatch.syspath_prepend(str(tmp_path))
+    runtime = Runtime()
+    runtime.eval_string('(defmacro swap (a b) `(list ~b ~a))')
+    start = threading.Barrier(8)
+
+    def run(i):
+        start.wait()
+        results[i] = runtime.eval_string(f'''
+            (import stress)
+            (defun f{i} (n) (if (= n 0) (list stress/loaded) (f{i} (- n 1))))
+            (concat (swap {i} (f{i} 100)) (to-list (map (lambda (_) (gensym)) (range 200))))
+        ''')
+
+    results = {}
+    threads = [threading.Thread(target=run, args=(i,)) for i in range(8)]
+    interval = sys.getswitchinterval()
+    sys.setswitchinterval(1e-6)
+    try:
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+    finally:
+        sys.setswitchinterval(interval)
+    assert [results[i][1] for i in range(8)] == list(range(8))
+    assert len({id(result[0][0]) for result in results.values()}) == 1
+    gensyms = [sym for result in results.values() for sym in result[2:]]
+    assert len(set(gensyms)) == len(gensyms) == 8 * 200
+
+
+@mark.parametrize('engine', [Evaluator, Compiler])
+def test_eval_string_async(engine):
+    runtime = Runtime(engine)
+    runtime.eval_string('(import py/asyncio)')
+    assert runtime.eval_string('(await (asyncio/sleep 0 1))') == 1
+
+    async def run():
+        # Evaluations overlap while they wait
+        return await asyncio.gather(*(
+            runtime.eval_string_async(f'(+ 1 (await (asyncio/sleep (/ 5) {i})))')
+            for i in range(5)))
+    start = time.perf_counter()
+    assert asyncio.run(run()) == [1, 2, 3, 4, 5]
+    assert time.perf_counter() - start < 0.8
+
+
+def test_many_concurrent_async_evaluations(engine):
+    runtime = Runtime(engine)
+    runtime.eval_string('(import py/asyncio)')
+
+    async def run():
+        return await asyncio.gather(*(
+            runtime.eval_string_async(f'(await (asyncio/sleep (/ 5) {i}))') for i in range(64)))
+    start = time.perf_counter()
+    assert asyncio.run(run()) == list(range(64))
+    assert time.perf_counter() - start < 0.6
+
+
+def test_await_in_running_loop():
+    runtime = Runtime()
+    runtime.eval_string('(import py/asyncio)')
+
+    async def run():
+        with raises(AwaitInRunningLoop, match='eval_string_async'):
+            runtime.eval_string('(await (asyncio/sleep 0))')
+    asyncio.run(run())
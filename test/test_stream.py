@@ -36,3 +36,11 @@ def test_iter_stream_pop():
     assert stream.pop_char() == 'c'
     with pytest.raises(StreamEmpty):
         stream.pop_char()
+
+
+def test_char_stream_source_meta():
+    stream = CharStream('ab\ncd\n\nef', filename='yadda')
+    meta = stream.source_meta(4)
+    assert stream.line_offsets is None
+    assert (meta.filename, meta.line, meta.col) == ('yadda', 2, 1)
+    assert str(stream.source_meta(7)) == 'yadda:4:0'
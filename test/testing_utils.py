@@ -5,3 +5,8 @@ from kaa.reader import Reader
 def read(s):
     "Convenience method for reading a single object from a string."
     return next(Reader(Namespace('testing')).read_string(s))
+
+
+def evaluate_string(evaluator, s):
+    "Read and evaluate all forms in a string, in the evaluator's namespace."
+    return evaluator.evaluate_all(Reader(evaluator.ns).read_string(s))
@@ -77,6 +77,9 @@
 (defun get-x () x)
 (def x 4)
 (test (= 4 (get-x)))
+(defmacro get-local () 'local)
+(test (= 5 (let ((local 5))
+             (do (get-local)))))
 
 ;; unquoting / splicing
 (let ((x '(b c d)))